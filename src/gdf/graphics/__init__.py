@@ -14,10 +14,24 @@ try:
     from .graphics_utils import (
         _rot2d_vertices_rectangle_,
         _convert_quads_to_triangles_,
+        _grow_float_buffer_,
+        _camera_2d_view_,
+        _rectangle_is_visible_,
+        _rectangles_are_visible_,
         _sprite_batch_2d_draw_,
+        _sprite_batch_2d_draw_many_,
+        _sprite_batch_2d_draw_particles_,
         _atlas_texture_batch_2d_draw_,
+        _atlas_texture_batch_2d_draw_particles_,
+        _batch_2d_draw_,
+        _layer_batch_2d_draw_,
+        _layer_batch_2d_draw_many_,
+        _instanced_sprite_2d_draw_,
+        _shape_batch_2d_add_,
         _sprite_batch_2d_render_,
         _atlas_texture_batch_2d_render_,
+        _batch_2d_render_,
+        _layer_batch_2d_render_,
     )
 except (ModuleNotFoundError, ImportError) as error:
     raise Exception(f"The compiled module could not be imported: {error}")
@@ -50,6 +64,7 @@ from . import scene
 from . import shader
 from . import skybox
 from . import sprite
+from . import stats
 from . import texture
 from . import window
 
@@ -57,20 +72,21 @@ from . import window
 # Импортируем основной функционал из скриптов:
 from .animator  import Animator2D
 from .atlas     import AtlasTexture
-from .batch     import SpriteBatch2D, AtlasTextureBatch2D
-from .buffers   import GLQuery, SSBO, FrameBuffer, VBO
+from .batch     import SpriteBatch2D, AtlasTextureBatch2D, Batch2D, StaticSpriteBatch2D, InstancedSpriteRenderer2D, ShapeBatch2D
+from .buffers   import GLQuery, SSBO, FrameBuffer, VBO, StreamVBO, QuadIndexBuffer
 from .camera    import Camera2D, Camera3D
-from .draw      import Draw2D, Draw3D
+from .draw      import Draw2D, Draw3D, DebugDraw3D
 from .font      import FontFile, FontGenerator
 from .image     import Image
 from .imgui     import ImGUI, imgui_bundle, imgui
 from .light     import Light2D
 from .packer    import PackerTexture
-from .particles import ParticleEffect2D
+from .particles import ParticleEffect2D, ParticleSystemManager, ParticleEffectPool
 from .renderer  import Renderer2D
 from .scene     import Scene
 from .shader    import ShaderProgram
 from .skybox    import SkyBox
 from .sprite    import Sprite2D
-from .texture   import Texture, Texture3D
+from .stats     import RenderStats
+from .texture   import Texture, Texture3D, TextureArray
 from .window    import Window
@@ -5,25 +5,68 @@
 
 # Импортируем:
 from .gl import *
+from .camera import Camera2D
 from .sprite import Sprite2D
-from .texture import Texture
+from .texture import Texture, TextureArray
 from .atlas import AtlasTexture
+from .buffers import VBO, StreamVBO, QuadIndexBuffer
+from .shader import ShaderProgram
+from .stats import RenderStats
 from ..math import *
 from ..utils import *
 from . import (
+    _rot2d_vertices_rectangle_,
+    _grow_float_buffer_,
+    _camera_2d_view_,
+    _rectangle_is_visible_,
+    _rectangles_are_visible_,
     _sprite_batch_2d_draw_,
+    _sprite_batch_2d_draw_many_,
+    _sprite_batch_2d_draw_particles_,
     _atlas_texture_batch_2d_draw_,
+    _atlas_texture_batch_2d_draw_particles_,
+    _batch_2d_draw_,
+    _layer_batch_2d_draw_,
+    _layer_batch_2d_draw_many_,
+    _instanced_sprite_2d_draw_,
+    _shape_batch_2d_add_,
     _sprite_batch_2d_render_,
     _atlas_texture_batch_2d_render_,
+    _batch_2d_render_,
+    _layer_batch_2d_render_,
 )
 
 
 # Класс пакетной отрисовки спрайтов:
 class SpriteBatch2D:
-    """ Этот класс не поддерживает отрисовку текстур атласов. Для этого есть класс AtlasTextureBatch2D """
+    """ Этот класс не поддерживает отрисовку текстур атласов. Для этого есть класс AtlasTextureBatch2D
 
-    def __init__(self) -> None:
-        self.texture_batches = {}  # Словарь хранит уникальные текстурки, и их вершины.
+        Вершины хранятся в буферах float32 (по одному на текстуру), которые растут вдвое при нехватке места
+        и переиспользуются между кадрами. Очистка пакета только сбрасывает счётчики, не удаляя буферы.
+
+        is_stream     - Загружать вершины в потоковый буфер на видеокарте (StreamVBO), а не передавать их из памяти
+                        процессора при каждом вызове отрисовки.
+        texture_array - Массив текстур (TextureArray). Спрайты, чьи текстуры есть в этом массиве, хранят номер
+                        слоя в каждой вершине и рисуются все вместе за один вызов отрисовки через шейдер.
+                        Остальные спрайты рисуются как обычно, по одному вызову на текстуру. Спрайты массива
+                        всегда рисуются первыми, то есть под остальными спрайтами пакета, независимо от порядка
+                        вызовов draw() (так же, как спрайты разных текстур идут группами, а не в порядке draw()).
+        camera        - 2D камера для отсечения спрайтов. Видимая область камеры запоминается в .begin(), и спрайты,
+                        нарисованные с cull_sprites=True, которые не попадают в неё, не добавляются в пакет
+                        (их количество за кадр хранится в culled).
+    """
+
+    _layer_shader_ = None  # Общий шейдер для отрисовки слоёв массива текстур. Создаётся при первой отрисовке.
+
+    def __init__(self, is_stream: bool = False, texture_array: TextureArray = None, camera: Camera2D = None) -> None:
+        self.texture_batches = {}  # Словарь хранит уникальные текстурки, и их [буфер вершин, кол-во чисел в буфере].
+        self.texture_array   = texture_array
+        self.layer_batch     = [numpy.empty(20, dtype=numpy.float32), 0]  # [Вершины слоёв массива, кол-во чисел].
+        self.camera      = camera
+        self.culled      = 0     # Сколько спрайтов было отсечено камерой с начала отрисовки.
+        self.is_stream   = is_stream
+        self._stream_    = None  # Потоковый буфер. Создаётся при первой отрисовке.
+        self._view_      = None  # Видимая область камеры на момент начала отрисовки.
         self._is_begin_  = False
 
     # Начать отрисовку:
@@ -34,6 +77,8 @@ class SpriteBatch2D:
                 "The function \".begin()\" cannot be called, since the last one "
                 "\".begin()\" was not closed by the \".end()\" function.")
         self._is_begin_ = True
+        self._view_     = None if self.camera is None else _camera_2d_view_(self.camera)
+        self.culled     = 0
         return self
 
     # Отрисовать спрайт:
@@ -43,18 +88,107 @@ class SpriteBatch2D:
              y:            float,
              width:        float,
              height:       float,
-             angle:        float = 0.0
+             angle:        float = 0.0,
+             cull_sprites: bool  = False
              ) -> "SpriteBatch2D":
         if not self._is_begin_:
             raise Exception(
                 "The \".begin()\" function was not called "
                 "before the \".draw()\" function.")
 
+        # Не добавляем спрайт, если камера его не видит:
+        if cull_sprites and self._view_ is not None:
+            if not _rectangle_is_visible_(self._view_, x, y, width, height, angle):
+                self.culled += 1
+                return self
+
+        # Если текстура спрайта есть в массиве текстур, добавляем спрайт в пакет слоёв:
+        if self.texture_array is not None and sprite.id in self.texture_array.layers:
+            layer = self.texture_array.layers[sprite.id]
+            _layer_batch_2d_draw_(self.layer_batch, layer, x, y, width, height, angle)
+            return self
+
         # Добавляем спрайт в пакет текстур используя оптимизированную функцию на Cython:
         _sprite_batch_2d_draw_(self.texture_batches, sprite.id, x, y, width, height, angle)
 
         return self
 
+    # Отрисовать множество спрайтов одной текстуры (параметры это массивы NumPy или одно число на все спрайты):
+    def draw_many(self,
+                  sprite:       Sprite2D | Texture,
+                  xs:           numpy.ndarray,
+                  ys:           numpy.ndarray,
+                  widths:       numpy.ndarray | float,
+                  heights:      numpy.ndarray | float,
+                  angles:       numpy.ndarray | float = 0.0,
+                  cull_sprites: bool                  = False
+                  ) -> "SpriteBatch2D":
+        if not self._is_begin_:
+            raise Exception(
+                "The \".begin()\" function was not called "
+                "before the \".draw_many()\" function.")
+
+        # Приводим параметры к массивам float32 одной длины (числа растягиваются на все спрайты без копирования):
+        count = len(xs)
+        params = [numpy.broadcast_to(numpy.asarray(p, dtype=numpy.float32), (count,))
+                  for p in (xs, ys, widths, heights, angles)]
+
+        # Оставляем только те спрайты, которые видит камера:
+        if cull_sprites and self._view_ is not None:
+            visible = _rectangles_are_visible_(self._view_, *params)
+            shown   = int(numpy.count_nonzero(visible))
+            if shown < count:
+                self.culled += count - shown
+                params = [p[visible] for p in params]
+
+        # Если текстура спрайтов есть в массиве текстур, добавляем их в пакет слоёв:
+        if self.texture_array is not None and sprite.id in self.texture_array.layers:
+            _layer_batch_2d_draw_many_(self.layer_batch, self.texture_array.layers[sprite.id], *params)
+            return self
+
+        # Добавляем все спрайты в пакет текстур за один вызов оптимизированной функции на Cython:
+        _sprite_batch_2d_draw_many_(self.texture_batches, sprite.id, *params)
+
+        return self
+
+    # Отрисовать частицы прямо из массивов частиц (например ParticleEffect2D.ParticleArrays):
+    def draw_particles(self,
+                       sprite:        Sprite2D | Texture,
+                       positions:     numpy.ndarray,
+                       sizes:         numpy.ndarray,
+                       angles:        numpy.ndarray,
+                       velocities:    numpy.ndarray = None,
+                       textures:      numpy.ndarray = None,
+                       texture_index: int           = 0
+                       ) -> "SpriteBatch2D":
+        """ positions и sizes - массивы (N, 2) float64 с центрами и размерами частиц, angles - (N,) float64.
+            velocities - (N, 2) float64 скорости, если частицы надо повернуть в сторону движения.
+            textures   - (N,) int32 номера текстур частиц, тогда добавляются только частицы с номером texture_index.
+            Вершины записываются сразу в буфер пакета одним проходом, без промежуточных массивов.
+        """
+
+        if not self._is_begin_:
+            raise Exception(
+                "The \".begin()\" function was not called "
+                "before the \".draw_particles()\" function.")
+
+        # Если текстура частиц есть в массиве текстур, добавляем их в пакет слоёв через обычный draw_many:
+        if self.texture_array is not None and sprite.id in self.texture_array.layers:
+            if textures is not None:
+                mask = textures == texture_index
+                positions, sizes, angles = positions[mask], sizes[mask], angles[mask]
+                if velocities is not None: velocities = velocities[mask]
+            if velocities is not None:
+                angles = angles + (180.0 - numpy.degrees(numpy.arctan2(velocities[:, 1], velocities[:, 0])))
+            return self.draw_many(
+                sprite, positions[:, 0] - sizes[:, 0] / 2, positions[:, 1] - sizes[:, 1] / 2,
+                sizes[:, 0], sizes[:, 1], angles)
+
+        _sprite_batch_2d_draw_particles_(
+            self.texture_batches, sprite.id, positions, sizes, angles, velocities, textures, texture_index)
+
+        return self
+
     # Закончить отрисовку:
     def end(self) -> "SpriteBatch2D":
         if self._is_begin_:
@@ -72,20 +206,96 @@ class SpriteBatch2D:
 
         gl.glColor(*[1, 1, 1] if color is None else color)
 
+        # Создаём потоковый буфер при первой отрисовке:
+        if self.is_stream and self._stream_ is None: self._stream_ = StreamVBO()
+
+        # Рисуем все спрайты из массива текстур за один вызов (они всегда под остальными спрайтами пакета):
+        if self.texture_array is not None and self.layer_batch[1] > 0: self._render_layers_(color)
+
         # Рисуем пакет спрайтов через ускоренную функцию на Cython:
-        _sprite_batch_2d_render_(self.texture_batches)
+        stream = self._stream_ if self.is_stream else None
+        draws, quads, nbytes = _sprite_batch_2d_render_(self.texture_batches, QuadIndexBuffer.get(), stream)
+        RenderStats.add(draws, draws, quads, nbytes)
+
+        if clear_batch: self.clear()
+
+        return self
+
+    # Отрисовать пакет слоёв массива текстур:
+    def _render_layers_(self, color: list = None) -> None:
+        # Создаём общий шейдер при первой отрисовке:
+        if SpriteBatch2D._layer_shader_ is None:
+            SpriteBatch2D._layer_shader_ = ShaderProgram(
+                vert="""
+                    #version 330 core
+
+                    uniform mat4 u_modelview;
+                    uniform mat4 u_projection;
+
+                    layout (location = 0) in vec2 a_position;
+                    layout (location = 1) in vec3 a_texcoord;  // Текстурные координаты и номер слоя.
+
+                    out vec3 v_texcoord;
+
+                    void main(void) {
+                        v_texcoord = a_texcoord;
+                        gl_Position = u_projection * u_modelview * vec4(a_position, 0.0, 1.0);
+                    }
+                """,
+                frag="""
+                    #version 330 core
+
+                    uniform sampler2DArray u_texture;
+                    uniform vec4           u_color;
+
+                    in vec3 v_texcoord;
 
-        if clear_batch: self.texture_batches.clear()
+                    out vec4 FragColor;
 
+                    void main(void) {
+                        FragColor = texture(u_texture, v_texcoord) * u_color;
+                    }
+                """
+            ).compile()
+
+        # Берём текущие матрицы OpenGL, чтобы пакет слоёв рисовался так же, как и остальные спрайты:
+        shader = SpriteBatch2D._layer_shader_
+        shader.begin()
+        shader.set_uniform("u_modelview",  gl.glGetFloatv(gl.GL_MODELVIEW_MATRIX))
+        shader.set_uniform("u_projection", gl.glGetFloatv(gl.GL_PROJECTION_MATRIX))
+        shader.set_uniform("u_color",      (*([1, 1, 1] if color is None else color), 1.0)[:4])
+        shader.set_uniform("u_texture",    0)
+        stream = self._stream_ if self.is_stream else None
+        draws, quads, nbytes = _layer_batch_2d_render_(self.layer_batch, self.texture_array.id, QuadIndexBuffer.get(), stream)
+        RenderStats.add(draws, draws, quads, nbytes)
+        shader.end()
+
+    # Очистить пакет (буферы вершин остаются и будут переиспользованы в следующем кадре):
+    def clear(self) -> "SpriteBatch2D":
+        for batch in self.texture_batches.values(): batch[1] = 0
+        self.layer_batch[1] = 0
         return self
 
+    # Освободить буферы вершин:
+    def destroy(self) -> None:
+        self.texture_batches.clear()
+        if self._stream_ is not None: self._stream_.destroy() ; self._stream_ = None
+
 
 # Класс пакетной отрисовки атласовых текстур:
 class AtlasTextureBatch2D:
-    """ Этот класс не поддерживает отрисовку спрайтов. Для этого есть класс SpriteBatch2D """
+    """ Этот класс не поддерживает отрисовку спрайтов. Для этого есть класс SpriteBatch2D
 
-    def __init__(self) -> None:
-        self.texture_batches = {}  # Словарь хранит уникальные текстурки, и их вершины.
+        Буферы и параметры is_stream и camera работают так же, как в SpriteBatch2D.
+    """
+
+    def __init__(self, is_stream: bool = False, camera: Camera2D = None) -> None:
+        self.texture_batches = {}  # Словарь хранит уникальные текстурки, и их [вершины, текст.координаты, кол-во чисел].
+        self.camera      = camera
+        self.culled      = 0     # Сколько спрайтов было отсечено камерой с начала отрисовки.
+        self.is_stream   = is_stream
+        self._stream_    = None  # Потоковый буфер. Создаётся при первой отрисовке.
+        self._view_      = None  # Видимая область камеры на момент начала отрисовки.
         self._is_begin_  = False
 
     # Начать отрисовку:
@@ -96,6 +306,8 @@ class AtlasTextureBatch2D:
                 "The function \".begin()\" cannot be called, since the last one "
                 "\".begin()\" was not closed by the \".end()\" function.")
         self._is_begin_ = True
+        self._view_     = None if self.camera is None else _camera_2d_view_(self.camera)
+        self.culled     = 0
         return self
 
     # Отрисовать спрайт:
@@ -113,11 +325,55 @@ class AtlasTextureBatch2D:
                 "The \".begin()\" function was not called "
                 "before the \".draw()\" function.")
 
+        # Не добавляем текстуру, если камера её не видит:
+        if cull_sprites and self._view_ is not None:
+            if not _rectangle_is_visible_(self._view_, x, y, width, height, angle):
+                self.culled += 1
+                return self
+
         # Добавляем текстуру в пакет текстур используя оптимизированную функцию на Cython:
         _atlas_texture_batch_2d_draw_(self.texture_batches, texture.id, texture.texcoords, x, y, width, height, angle)
 
         return self
 
+    # Отрисовать частицы с кадрами атласа прямо из массивов частиц (например ParticleEffect2D.ParticleArrays):
+    def draw_particles(self,
+                       frames:        list[AtlasTexture],
+                       positions:     numpy.ndarray,
+                       sizes:         numpy.ndarray,
+                       angles:        numpy.ndarray,
+                       velocities:    numpy.ndarray = None,
+                       frame_indices: numpy.ndarray = None
+                       ) -> "AtlasTextureBatch2D":
+        """ frames - кадры (текстуры атласа), frame_indices - (N,) int32 номер кадра каждой частицы (None - кадр 0).
+            Остальные параметры как у SpriteBatch2D.draw_particles(). Кадры одного атласа рисуются одним вызовом
+            отрисовки, а кадры из разных атласов делятся по атласам.
+        """
+
+        if not self._is_begin_:
+            raise Exception(
+                "The \".begin()\" function was not called "
+                "before the \".draw_particles()\" function.")
+
+        # Текстурные координаты кадров (для кадров из разных атласов чужие кадры остаются, но не используются):
+        texcoords = numpy.array([frame.texcoords for frame in frames], dtype=numpy.float32).reshape(-1, 8)
+        atlas_ids = [frame.id for frame in frames]
+        if len(set(atlas_ids)) == 1:
+            _atlas_texture_batch_2d_draw_particles_(
+                self.texture_batches, atlas_ids[0], texcoords, positions, sizes, angles, velocities, frame_indices)
+            return self
+
+        # Если кадры из разных атласов, делим частицы по атласам:
+        indices = numpy.zeros(len(positions), dtype=numpy.int32) if frame_indices is None else frame_indices
+        frame_atlas = numpy.array(atlas_ids)[numpy.clip(indices, 0, len(frames) - 1)]
+        for atlas_id in dict.fromkeys(atlas_ids):
+            mask = frame_atlas == atlas_id
+            _atlas_texture_batch_2d_draw_particles_(
+                self.texture_batches, atlas_id, texcoords, positions[mask], sizes[mask], angles[mask],
+                None if velocities is None else velocities[mask], indices[mask])
+
+        return self
+
     # Закончить отрисовку:
     def end(self) -> "AtlasTextureBatch2D":
         if self._is_begin_:
@@ -135,9 +391,951 @@ class AtlasTextureBatch2D:
 
         gl.glColor(*[1, 1, 1] if color is None else color)
 
+        # Создаём потоковый буфер при первой отрисовке:
+        if self.is_stream and self._stream_ is None: self._stream_ = StreamVBO()
+
+        # Рисуем пакет спрайтов через ускоренную функцию на Cython:
+        stream = self._stream_ if self.is_stream else None
+        draws, quads, nbytes = _atlas_texture_batch_2d_render_(self.texture_batches, QuadIndexBuffer.get(), stream)
+        RenderStats.add(draws, draws, quads, nbytes)
+
+        if clear_batch: self.clear()
+
+        return self
+
+    # Очистить пакет (буферы остаются и будут переиспользованы в следующем кадре):
+    def clear(self) -> "AtlasTextureBatch2D":
+        for batch in self.texture_batches.values(): batch[2] = 0
+        return self
+
+    # Освободить буферы:
+    def destroy(self) -> None:
+        self.texture_batches.clear()
+        if self._stream_ is not None: self._stream_.destroy() ; self._stream_ = None
+
+
+# Класс универсальной пакетной отрисовки (спрайты, текстуры и текстуры атласов вперемешку):
+class Batch2D:
+    """ Каждая вершина хранит свои текстурные координаты и цвет, поэтому в одном пакете можно смешивать
+        Sprite2D, Texture и AtlasTexture, а также задавать цвет каждому спрайту отдельно.
+        Все спрайты одной текстуры рисуются за один вызов отрисовки.
+
+        Буферы и параметр is_stream работают так же, как в SpriteBatch2D.
+    """
+
+    def __init__(self, is_stream: bool = False) -> None:
+        self.texture_batches = {}  # Словарь хранит уникальные текстурки, и их [буфер вершин, кол-во чисел в буфере].
+        self.is_stream   = is_stream
+        self._stream_    = None  # Потоковый буфер. Создаётся при первой отрисовке.
+        self._is_begin_  = False
+
+    # Начать отрисовку:
+    def begin(self) -> "Batch2D":
+        if self._is_begin_:
+            raise Exception(
+                "Function \".end()\" was not called in the last iteration of the loop.\n"
+                "The function \".begin()\" cannot be called, since the last one "
+                "\".begin()\" was not closed by the \".end()\" function.")
+        self._is_begin_ = True
+        return self
+
+    # Отрисовать спрайт:
+    def draw(self,
+             sprite: Sprite2D | Texture | AtlasTexture,
+             x:      float,
+             y:      float,
+             width:  float,
+             height: float,
+             angle:  float = 0.0,
+             color:  list  = None
+             ) -> "Batch2D":
+        if not self._is_begin_:
+            raise Exception(
+                "The \".begin()\" function was not called "
+                "before the \".draw()\" function.")
+
+        # Текстурные координаты есть только у текстуры атласа (в том числе внутри спрайта):
+        texture = sprite.texture if type(sprite) is Sprite2D else sprite
+        texcoords = texture.texcoords if type(texture) is AtlasTexture else None
+
+        # Цвет спрайта:
+        r, g, b, a = (1.0, 1.0, 1.0, 1.0) if color is None else (*color, 1.0)[:4]
+
+        # Добавляем спрайт в пакет текстур используя оптимизированную функцию на Cython:
+        _batch_2d_draw_(self.texture_batches, sprite.id, texcoords, x, y, width, height, angle, r, g, b, a)
+
+        return self
+
+    # Закончить отрисовку:
+    def end(self) -> "Batch2D":
+        if self._is_begin_:
+            self._is_begin_ = False
+        else:
+            raise Exception("The \".begin()\" function was not called before the \".end()\" function.")
+        return self
+
+    # Отрисовать все спрайты:
+    def render(self, clear_batch: bool = True) -> "Batch2D":
+        if self._is_begin_:
+            raise Exception(
+                "You cannot call the \".render()\" function after \".begin()\" and not earlier than \".end()\""
+            )
+
+        # Создаём потоковый буфер при первой отрисовке:
+        if self.is_stream and self._stream_ is None: self._stream_ = StreamVBO()
+
         # Рисуем пакет спрайтов через ускоренную функцию на Cython:
-        _atlas_texture_batch_2d_render_(self.texture_batches)
+        stream = self._stream_ if self.is_stream else None
+        draws, quads, nbytes = _batch_2d_render_(self.texture_batches, QuadIndexBuffer.get(), stream)
+        RenderStats.add(draws, draws, quads, nbytes)
+
+        if clear_batch: self.clear()
+
+        return self
+
+    # Очистить пакет (буферы вершин остаются и будут переиспользованы в следующем кадре):
+    def clear(self) -> "Batch2D":
+        for batch in self.texture_batches.values(): batch[1] = 0
+        return self
+
+    # Освободить буферы вершин:
+    def destroy(self) -> None:
+        self.texture_batches.clear()
+        if self._stream_ is not None: self._stream_.destroy() ; self._stream_ = None
+
+
+# Класс статической пакетной отрисовки спрайтов (буферы на видеокарте собираются один раз):
+class StaticSpriteBatch2D:
+    """ Для статичных спрайтов (фоны, тайлы уровня), которые почти не меняются между кадрами.
+        Каждый добавленный спрайт получает номер (handle), по которому его можно изменить или удалить.
+        При отрисовке на видеокарту загружаются только изменённые участки буферов, поэтому неизменный
+        уровень ничего не стоит процессору в каждом кадре.
+
+        Принимает Sprite2D, Texture и AtlasTexture. Вершины каждой текстуры хранятся отдельно
+        (на вершину: x, y, u, v) и рисуются одним вызовом отрисовки на текстуру.
+    """
+
+    # Группа спрайтов одной текстуры:
+    class TextureGroup:
+        def __init__(self, texture_id: int) -> None:
+            self.texture_id = texture_id
+            self.vertices   = numpy.empty((16, 16), dtype=numpy.float32)  # 16 чисел на спрайт.
+            self.handles    = numpy.empty(16, dtype=numpy.int64)           # Номер спрайта в каждом слоте.
+            self.count      = 0      # Количество спрайтов в группе.
+            self.vbo        = None   # Вершинный буфер группы на видеокарте.
+            self.capacity   = 0      # Вместимость буфера на видеокарте (в спрайтах).
+            self.dirty      = set()  # Слоты, которые изменились с прошлой загрузки.
+
+        # Зарезервировать место под count новых спрайтов:
+        def reserve(self, count: int) -> None:
+            capacity = len(self.vertices)
+            if self.count + count <= capacity: return
+            while capacity < self.count + count: capacity *= 2
+
+            vertices, handles = numpy.empty((capacity, 16), numpy.float32), numpy.empty(capacity, numpy.int64)
+            vertices[:self.count], handles[:self.count] = self.vertices[:self.count], self.handles[:self.count]
+            self.vertices, self.handles = vertices, handles
+
+        # Загрузить изменения на видеокарту (возвращает количество загруженных байт):
+        def upload(self) -> int:
+            nbytes = 0
+            if self.vbo is None: self.vbo = gl.glGenBuffers(1)
+            gl.glBindBuffer(gl.GL_ARRAY_BUFFER, self.vbo)
+
+            # Если буфер на видеокарте мал, пересоздаём его и загружаем все вершины:
+            if self.capacity < len(self.vertices):
+                self.capacity = len(self.vertices)
+                gl.glBufferData(gl.GL_ARRAY_BUFFER, self.vertices.nbytes, self.vertices, gl.GL_STATIC_DRAW)
+                nbytes = self.vertices.nbytes
+
+            # Иначе загружаем только непрерывные участки изменённых слотов:
+            elif self.dirty:
+                slots = numpy.sort(numpy.fromiter(self.dirty, dtype=numpy.int64, count=len(self.dirty)))
+                slots = slots[slots < self.count]
+                if len(slots) > 0:
+                    breaks = numpy.flatnonzero(numpy.diff(slots) != 1) + 1
+                    firsts = slots[numpy.r_[0, breaks]].tolist()
+                    lasts  = slots[numpy.r_[breaks - 1, len(slots) - 1]].tolist()
+                    for first, last in zip(firsts, lasts):
+                        data = self.vertices[first:last+1]
+                        gl.glBufferSubData(gl.GL_ARRAY_BUFFER, first * 64, data.nbytes, data)
+                        nbytes += data.nbytes
+
+            gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
+            self.dirty.clear()
+            return nbytes
+
+        # Удалить буфер на видеокарте:
+        def destroy(self) -> None:
+            if self.vbo is not None: gl.glDeleteBuffers(1, [self.vbo])
+            self.vbo, self.capacity = None, 0
+
+    def __init__(self) -> None:
+        self.groups       = {}  # Словарь групп спрайтов (id текстуры: TextureGroup).
+        self._handles_    = {}  # Где лежит каждый спрайт (handle: [группа, слот]).
+        self._next_handle_ = 0
+
+    # Получить вершины спрайта (4 вершины по x, y, u, v):
+    @staticmethod
+    def _get_quad_(sprite: Sprite2D | Texture | AtlasTexture,
+                   x: float, y: float, width: float, height: float, angle: float) -> numpy.ndarray:
+        texture = sprite.texture if type(sprite) is Sprite2D else sprite
+        texcoords = texture.texcoords if type(texture) is AtlasTexture else [0, 1, 1, 1, 1, 0, 0, 0]
+        if angle != 0.0: vertices = _rot2d_vertices_rectangle_(x, y, width, height, angle)
+        else: vertices = [x, y, x + width, y, x + width, y + height, x, y + height]
+
+        quad = numpy.empty(16, dtype=numpy.float32)
+        quad.reshape(4, 4)[:, 0:2] = numpy.reshape(vertices, (4, 2))
+        quad.reshape(4, 4)[:, 2:4] = numpy.reshape(texcoords, (4, 2))
+        return quad
+
+    # Добавить спрайт. Возвращает номер спрайта:
+    def add(self,
+            sprite: Sprite2D | Texture | AtlasTexture,
+            x:      float,
+            y:      float,
+            width:  float,
+            height: float,
+            angle:  float = 0.0
+            ) -> int:
+        handle = self._next_handle_
+        self._next_handle_ += 1
+        self._insert_(handle, sprite, self._get_quad_(sprite, x, y, width, height, angle))
+        return handle
+
+    # Записать спрайт в конец группы его текстуры:
+    def _insert_(self, handle: int, sprite: Sprite2D | Texture | AtlasTexture, quad: numpy.ndarray) -> None:
+        group = self.groups.get(sprite.id)
+        if group is None: group = self.groups[sprite.id] = StaticSpriteBatch2D.TextureGroup(sprite.id)
+
+        group.reserve(1)
+        slot = group.count
+        group.vertices[slot] = quad
+        group.handles[slot]  = handle
+        group.count += 1
+        group.dirty.add(slot)
+        self._handles_[handle] = [group, slot]
+
+    # Убрать спрайт из слота группы (на его место переносится последний спрайт группы):
+    def _remove_slot_(self, group: "StaticSpriteBatch2D.TextureGroup", slot: int) -> None:
+        last = group.count - 1
+        if slot != last:
+            group.vertices[slot] = group.vertices[last]
+            group.handles[slot]  = group.handles[last]
+            self._handles_[int(group.handles[slot])][1] = slot
+            group.dirty.add(slot)
+        group.count -= 1
+
+    # Добавить множество спрайтов одной текстуры (параметры это массивы NumPy или одно число на все спрайты):
+    def add_many(self,
+                 sprite:  Sprite2D | Texture | AtlasTexture,
+                 xs:      numpy.ndarray,
+                 ys:      numpy.ndarray,
+                 widths:  numpy.ndarray | float,
+                 heights: numpy.ndarray | float,
+                 angles:  numpy.ndarray | float = 0.0
+                 ) -> numpy.ndarray:
+        count = len(xs)
+        group = self.groups.get(sprite.id)
+        if group is None: group = self.groups[sprite.id] = StaticSpriteBatch2D.TextureGroup(sprite.id)
+
+        # Вращаем вершины всех спрайтов за один проход через ту же функцию, что и SpriteBatch2D.draw_many():
+        params = [numpy.broadcast_to(numpy.asarray(p, dtype=numpy.float32), (count,))
+                  for p in (xs, ys, widths, heights, angles)]
+        tbat = {} ; _sprite_batch_2d_draw_many_(tbat, sprite.id, *params)
+        if not tbat: return numpy.empty(0, dtype=numpy.int64)
+
+        # Текстурные координаты:
+        texture = sprite.texture if type(sprite) is Sprite2D else sprite
+        texcoords = texture.texcoords if type(texture) is AtlasTexture else [0, 1, 1, 1, 1, 0, 0, 0]
+
+        # Записываем все спрайты в конец группы:
+        group.reserve(count)
+        first   = group.count
+        handles = numpy.arange(self._next_handle_, self._next_handle_ + count, dtype=numpy.int64)
+        quads   = group.vertices[first:first+count].reshape(count, 4, 4)
+        quads[:, :, 0:2] = tbat[sprite.id][0][:count*8].reshape(count, 4, 2)
+        quads[:, :, 2:4] = numpy.reshape(texcoords, (4, 2))
+        group.handles[first:first+count] = handles
+        group.count += count
+        group.dirty.update(range(first, first + count))
+
+        for slot, handle in enumerate(handles.tolist(), first): self._handles_[handle] = [group, slot]
+        self._next_handle_ += count
+        return handles
+
+    # Изменить спрайт по номеру:
+    def update(self,
+               handle: int,
+               sprite: Sprite2D | Texture | AtlasTexture,
+               x:      float,
+               y:      float,
+               width:  float,
+               height: float,
+               angle:  float = 0.0
+               ) -> "StaticSpriteBatch2D":
+        group, slot = self._handles_[handle]
+        quad = self._get_quad_(sprite, x, y, width, height, angle)
+
+        # Если у спрайта сменилась текстура, переносим его в группу новой текстуры:
+        if group.texture_id != sprite.id:
+            self._remove_slot_(group, slot)
+            self._insert_(handle, sprite, quad)
+            return self
+
+        group.vertices[slot] = quad
+        group.dirty.add(slot)
+        return self
+
+    # Удалить спрайт по номеру:
+    def remove(self, handle: int) -> "StaticSpriteBatch2D":
+        group, slot = self._handles_.pop(handle)
+        self._remove_slot_(group, slot)
+        return self
+
+    # Отрисовать все спрайты:
+    def render(self, color: list = None) -> "StaticSpriteBatch2D":
+        gl.glColor(*[1, 1, 1] if color is None else color)
+
+        gl.glEnable(gl.GL_TEXTURE_2D)
+        gl.glEnableClientState(gl.GL_VERTEX_ARRAY)
+        gl.glEnableClientState(gl.GL_TEXTURE_COORD_ARRAY)
+
+        # Индексный буфер должен вмещать самую большую группу:
+        indices = QuadIndexBuffer.get().begin(max((group.count for group in self.groups.values()), default=0))
+
+        for texture_id, group in self.groups.items():
+            if group.count == 0: continue
+
+            # Загружаем изменения (если они есть) и рисуем группу из буфера на видеокарте:
+            if group.vbo is None or group.dirty or group.capacity < len(group.vertices):
+                RenderStats.add(bytes_uploaded=group.upload())
+            gl.glBindTexture(gl.GL_TEXTURE_2D, texture_id)
+            gl.glBindBuffer(gl.GL_ARRAY_BUFFER, group.vbo)
+            gl.glVertexPointer(2, gl.GL_FLOAT, 16, ctypes.c_void_p(0))
+            gl.glTexCoordPointer(2, gl.GL_FLOAT, 16, ctypes.c_void_p(8))
+            indices.draw(group.count)
+            RenderStats.add(1, 1, group.count)
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
+        indices.end()
+        gl.glBindTexture(gl.GL_TEXTURE_2D, 0)
+
+        gl.glDisableClientState(gl.GL_TEXTURE_COORD_ARRAY)
+        gl.glDisableClientState(gl.GL_VERTEX_ARRAY)
+        gl.glDisable(gl.GL_TEXTURE_2D)
+
+        return self
+
+    # Удалить все спрайты (буферы на видеокарте остаются):
+    def clear(self) -> "StaticSpriteBatch2D":
+        for group in self.groups.values(): group.count = 0 ; group.dirty.clear()
+        self._handles_.clear()
+        return self
+
+    # Удалить пакет и его буферы на видеокарте:
+    def destroy(self) -> None:
+        for group in self.groups.values(): group.destroy()
+        self.groups.clear()
+        self._handles_.clear()
+
+
+# Класс аппаратной (инстансной) отрисовки спрайтов:
+class InstancedSpriteRenderer2D:
+    """ На видеокарту загружается одна запись на спрайт (x, y, ширина, высота, угол, u0, v0, u1, v1 и цвет RGBA
+        в 4-х байтах, всего 40 байт), а квадраты строятся и вращаются в вершинном шейдере. Пакет Batch2D тратит
+        на тот же спрайт 128 байт и считает повороты на процессоре.
+
+        Можно смешивать Sprite2D, Texture и AtlasTexture. Все спрайты одной текстуры рисуются за один вызов
+        glDrawArraysInstanced, а записи всех текстур загружаются в один буфер VBO за один раз.
+    """
 
-        if clear_batch: self.texture_batches.clear()
+    _shader_ = None  # Общий шейдер инстансной отрисовки. Создаётся при первой отрисовке.
 
+    def __init__(self) -> None:
+        self.texture_batches = {}  # Словарь хранит уникальные текстурки, и их [буфер записей, кол-во чисел в буфере].
+        self._frame_     = numpy.empty(0, dtype=numpy.float32)  # Записи всех текстур кадра подряд.
+        self._vbo_       = None  # Буфер записей на видеокарте. Создаётся при первой отрисовке.
+        self._is_begin_  = False
+
+    # Начать отрисовку:
+    def begin(self) -> "InstancedSpriteRenderer2D":
+        if self._is_begin_:
+            raise Exception(
+                "Function \".end()\" was not called in the last iteration of the loop.\n"
+                "The function \".begin()\" cannot be called, since the last one "
+                "\".begin()\" was not closed by the \".end()\" function.")
+        self._is_begin_ = True
+        return self
+
+    # Получить текстурные координаты (u0, v0, u1, v1) нижнего левого и верхнего правого углов:
+    @staticmethod
+    def _get_uv_rect_(sprite: Sprite2D | Texture | AtlasTexture) -> tuple:
+        texture = sprite.texture if type(sprite) is Sprite2D else sprite
+        if type(texture) is AtlasTexture:
+            tcrd = texture.texcoords
+            return tcrd[0], tcrd[1], tcrd[4], tcrd[5]
+        return 0.0, 1.0, 1.0, 0.0
+
+    # Отрисовать спрайт:
+    def draw(self,
+             sprite: Sprite2D | Texture | AtlasTexture,
+             x:      float,
+             y:      float,
+             width:  float,
+             height: float,
+             angle:  float = 0.0,
+             color:  list  = None
+             ) -> "InstancedSpriteRenderer2D":
+        if not self._is_begin_:
+            raise Exception(
+                "The \".begin()\" function was not called "
+                "before the \".draw()\" function.")
+
+        u0, v0, u1, v1 = self._get_uv_rect_(sprite)
+        r, g, b, a = (1.0, 1.0, 1.0, 1.0) if color is None else (*color, 1.0)[:4]
+
+        # Добавляем запись спрайта в пакет используя оптимизированную функцию на Cython:
+        _instanced_sprite_2d_draw_(self.texture_batches, sprite.id, x, y, width, height, angle,
+                                   u0, v0, u1, v1, r, g, b, a)
+
+        return self
+
+    # Отрисовать множество спрайтов одной текстуры (параметры это массивы NumPy или одно значение на все спрайты):
+    def draw_many(self,
+                  sprite:  Sprite2D | Texture | AtlasTexture,
+                  xs:      numpy.ndarray,
+                  ys:      numpy.ndarray,
+                  widths:  numpy.ndarray | float,
+                  heights: numpy.ndarray | float,
+                  angles:  numpy.ndarray | float = 0.0,
+                  colors:  numpy.ndarray | list  = None
+                  ) -> "InstancedSpriteRenderer2D":
+        if not self._is_begin_:
+            raise Exception(
+                "The \".begin()\" function was not called "
+                "before the \".draw_many()\" function.")
+
+        count = len(xs)
+        if count == 0: return self
+
+        # Получаем буфер записей текстуры (увеличиваем его вдвое, если записи не помещаются):
+        batch = self.texture_batches.setdefault(sprite.id, [numpy.empty(640, dtype=numpy.float32), 0])
+        size = batch[1]
+        if size + count * 10 > len(batch[0]): batch[0] = _grow_float_buffer_(batch[0], size, size + count * 10)
+        records = batch[0][size:size + count * 10].reshape(count, 10)
+
+        # Записываем все поля записей за раз:
+        records[:, 0] = xs
+        records[:, 1] = ys
+        records[:, 2] = widths
+        records[:, 3] = heights
+        records[:, 4] = angles
+        records[:, 5:9] = self._get_uv_rect_(sprite)
+
+        # Цвета упаковываются в 4 байта RGBA (один цвет на все спрайты или массив цветов формы (count, 4)):
+        colors = numpy.ones(4, dtype=numpy.float32) if colors is None else numpy.asarray(colors, dtype=numpy.float32)
+        if colors.shape[-1] == 3: colors = numpy.concatenate([colors, numpy.ones(colors.shape[:-1] + (1,))], axis=-1)
+        packed = (numpy.clip(colors, 0.0, 1.0) * 255.0 + 0.5).astype(numpy.uint8).reshape(-1, 4)
+        records[:, 9:10].view(numpy.uint8)[:] = packed
+
+        batch[1] = size + count * 10
+        return self
+
+    # Закончить отрисовку:
+    def end(self) -> "InstancedSpriteRenderer2D":
+        if self._is_begin_:
+            self._is_begin_ = False
+        else:
+            raise Exception("The \".begin()\" function was not called before the \".end()\" function.")
+        return self
+
+    # Создать общий шейдер:
+    @staticmethod
+    def _get_shader_() -> ShaderProgram:
+        if InstancedSpriteRenderer2D._shader_ is None:
+            InstancedSpriteRenderer2D._shader_ = ShaderProgram(
+                vert="""
+                    #version 330 core
+
+                    uniform mat4 u_modelview;
+                    uniform mat4 u_projection;
+
+                    layout (location = 0) in vec4  a_rect;     // Позиция и размер спрайта.
+                    layout (location = 1) in float a_angle;    // Угол спрайта в градусах.
+                    layout (location = 2) in vec4  a_uv_rect;  // Текстурные координаты углов (u0, v0, u1, v1).
+                    layout (location = 3) in vec4  a_color;    // Цвет спрайта.
+
+                    out vec2 v_texcoord;
+                    out vec4 v_color;
+
+                    void main(void) {
+                        // Угол квадрата по номеру вершины: (0, 0), (1, 0), (0, 1), (1, 1):
+                        vec2 corner = vec2(gl_VertexID & 1, gl_VertexID >> 1);
+
+                        // Вращаем вершину вокруг центра спрайта (по часовой стрелке, как и в других пакетах):
+                        float angle  = -radians(a_angle);
+                        vec2  offset = (corner - 0.5) * a_rect.zw;
+                        vec2  vertex = a_rect.xy + a_rect.zw * 0.5 + vec2(
+                            offset.x * cos(angle) - offset.y * sin(angle),
+                            offset.x * sin(angle) + offset.y * cos(angle)
+                        );
+
+                        v_texcoord  = mix(a_uv_rect.xy, a_uv_rect.zw, corner);
+                        v_color     = a_color;
+                        gl_Position = u_projection * u_modelview * vec4(vertex, 0.0, 1.0);
+                    }
+                """,
+                frag="""
+                    #version 330 core
+
+                    uniform sampler2D u_texture;
+                    uniform vec4      u_color;
+
+                    in vec2 v_texcoord;
+                    in vec4 v_color;
+
+                    out vec4 FragColor;
+
+                    void main(void) {
+                        FragColor = texture(u_texture, v_texcoord) * v_color * u_color;
+                    }
+                """
+            ).compile()
+        return InstancedSpriteRenderer2D._shader_
+
+    # Отрисовать все спрайты:
+    def render(self, color: list = None, clear_batch: bool = True) -> "InstancedSpriteRenderer2D":
+        if self._is_begin_:
+            raise Exception(
+                "You cannot call the \".render()\" function after \".begin()\" and not earlier than \".end()\""
+            )
+
+        # Собираем записи всех текстур подряд и загружаем их на видеокарту за один раз:
+        total = sum(batch[1] for batch in self.texture_batches.values())
+        if total == 0: return self
+        if len(self._frame_) < total: self._frame_ = _grow_float_buffer_(self._frame_, 0, total)
+        offsets, offset = [], 0
+        for texture, batch in self.texture_batches.items():
+            if batch[1] == 0: continue
+            self._frame_[offset:offset + batch[1]] = batch[0][:batch[1]]
+            offsets.append((texture, offset, batch[1] // 10))
+            offset += batch[1]
+
+        if self._vbo_ is None: self._vbo_ = VBO(self._frame_[:total], gl.GL_STREAM_DRAW)
+        else: self._vbo_.update(self._frame_[:total])
+        RenderStats.add(bytes_uploaded=total * 4)
+
+        # Берём текущие матрицы OpenGL, чтобы спрайты рисовались так же, как и в других пакетах:
+        shader = self._get_shader_()
+        shader.begin()
+        shader.set_uniform("u_modelview",  gl.glGetFloatv(gl.GL_MODELVIEW_MATRIX))
+        shader.set_uniform("u_projection", gl.glGetFloatv(gl.GL_PROJECTION_MATRIX))
+        shader.set_uniform("u_color",      (*([1, 1, 1] if color is None else color), 1.0)[:4])
+        shader.set_uniform("u_texture",    0)
+
+        gl.glActiveTexture(gl.GL_TEXTURE0)
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, self._vbo_.id)
+        for i in range(4):
+            gl.glEnableVertexAttribArray(i)
+            gl.glVertexAttribDivisor(i, 1)
+
+        # Рисуем все спрайты каждой текстуры за один вызов (шаг записи 40 байт):
+        for texture, offset, count in offsets:
+            gl.glBindTexture(gl.GL_TEXTURE_2D, texture)
+            gl.glVertexAttribPointer(0, 4, gl.GL_FLOAT, gl.GL_FALSE, 40, ctypes.c_void_p(offset * 4))
+            gl.glVertexAttribPointer(1, 1, gl.GL_FLOAT, gl.GL_FALSE, 40, ctypes.c_void_p(offset * 4 + 16))
+            gl.glVertexAttribPointer(2, 4, gl.GL_FLOAT, gl.GL_FALSE, 40, ctypes.c_void_p(offset * 4 + 20))
+            gl.glVertexAttribPointer(3, 4, gl.GL_UNSIGNED_BYTE, gl.GL_TRUE, 40, ctypes.c_void_p(offset * 4 + 36))
+            gl.glDrawArraysInstanced(gl.GL_TRIANGLE_STRIP, 0, 4, count)
+            RenderStats.add(1, 1, count)
+
+        for i in range(4):
+            gl.glVertexAttribDivisor(i, 0)
+            gl.glDisableVertexAttribArray(i)
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, 0)
+        shader.end()
+
+        if clear_batch: self.clear()
+
+        return self
+
+    # Очистить пакет (буферы записей остаются и будут переиспользованы в следующем кадре):
+    def clear(self) -> "InstancedSpriteRenderer2D":
+        for batch in self.texture_batches.values(): batch[1] = 0
+        return self
+
+    # Освободить буферы:
+    def destroy(self) -> None:
+        self.texture_batches.clear()
+        if self._vbo_ is not None: self._vbo_.destroy() ; self._vbo_ = None
+
+
+# Класс пакетной отрисовки 2D примитивов (точек, линий и фигур с заливкой):
+class ShapeBatch2D:
+    """ Повторяет функции Draw2D, но вместо glBegin/glEnd накапливает вершины (x, y, r, g, b, a) в буферах NumPy.
+        Ленты, веера, петли и многоугольники сразу превращаются в отдельные линии и треугольники, поэтому
+        все примитивы одного типа рисуются за один вызов отрисовки: точки и линии отдельно для каждого размера
+        (и сглаживания), а все фигуры с заливкой вместе.
+
+        Порядок отрисовки сохраняется только внутри одного типа примитивов: сначала рисуются фигуры с заливкой,
+        затем линии, затем точки.
+
+        Через Draw2D.set_batch() в этот пакет можно направить все вызовы Draw2D.
+        Буферы и параметр is_stream работают так же, как в SpriteBatch2D.
+    """
+
+    # Порядок отрисовки типов примитивов:
+    _MODE_ORDER_ = {gl.GL_TRIANGLES: 0, gl.GL_LINES: 1, gl.GL_POINTS: 2}
+
+    _indices_ = {}  # Кэш порядков вершин для пересборки фигур в линии и треугольники ((вид, кол-во вершин): индексы).
+
+    def __init__(self, is_stream: bool = False) -> None:
+        self.shape_batches = {}  # Словарь хранит группы (тип, размер, сглаживание), и их [буфер вершин, кол-во чисел].
+        self.is_stream   = is_stream
+        self._stream_    = None  # Потоковый буфер. Создаётся при первой отрисовке.
+        self._is_begin_  = False
+
+    # Начать отрисовку:
+    def begin(self) -> "ShapeBatch2D":
+        if self._is_begin_:
+            raise Exception(
+                "Function \".end()\" was not called in the last iteration of the loop.\n"
+                "The function \".begin()\" cannot be called, since the last one "
+                "\".begin()\" was not closed by the \".end()\" function.")
+        self._is_begin_ = True
+        return self
+
+    # Получить порядок вершин, превращающий фигуру из count вершин в отдельные линии или треугольники:
+    @staticmethod
+    def _get_indices_(kind: str, count: int) -> numpy.ndarray:
+        indices = ShapeBatch2D._indices_.get((kind, count))
+        if indices is not None: return indices
+
+        if kind == "strip":  # Ломаная линия: (0, 1), (1, 2), ...
+            index = numpy.arange(count - 1)
+            indices = numpy.column_stack([index, index + 1])
+        elif kind == "loop":  # Замкнутая ломаная линия: ..., (n-1, 0).
+            index = numpy.arange(count)
+            indices = numpy.column_stack([index, (index + 1) % count])
+        elif kind == "triangle_strip":  # Треугольники с общей стороной: (0, 1, 2), (1, 2, 3), ...
+            index = numpy.arange(count - 2)
+            indices = numpy.column_stack([index, index + 1, index + 2])
+        elif kind == "fan":  # Веер треугольников вокруг первой вершины: (0, 1, 2), (0, 2, 3), ...
+            index = numpy.arange(1, count - 1)
+            indices = numpy.column_stack([numpy.zeros_like(index), index, index + 1])
+        elif kind == "quads":  # Каждые 4 вершины это 2 треугольника:
+            indices = numpy.arange(count // 4)[:, None] * 4 + numpy.array([0, 1, 2, 2, 3, 0])
+        else:  # Полоса квадратов (вершины 0, 1, 3, 2 образуют квадрат):
+            indices = numpy.arange((count - 2) // 2)[:, None] * 2 + numpy.array([0, 1, 3, 3, 2, 0])
+
+        indices = ShapeBatch2D._indices_[(kind, count)] = numpy.ascontiguousarray(indices.ravel(), dtype=numpy.int64)
+        return indices
+
+    # Добавить вершины в группу (indices - порядок вершин, если их нужно пересобрать в линии или треугольники):
+    def _add_(self,
+              name:     str,
+              mode:     int,
+              size:     float,
+              smooth:   bool,
+              color:    list,
+              vertices: list,
+              indices:  numpy.ndarray = None
+              ) -> "ShapeBatch2D":
+        if not self._is_begin_:
+            raise Exception(
+                "The \".begin()\" function was not called "
+                f"before the \".{name}()\" function.")
+
+        vertices = numpy.asarray(vertices, dtype=numpy.float64)
+        if vertices.ndim == 1: vertices = vertices.reshape(1, -1)
+        r, g, b, a = (1.0, 1.0, 1.0, 1.0) if not color else (*color, 1.0)[:4]
+
+        # Получаем буфер группы и записываем в него вершины используя оптимизированную функцию на Cython:
+        batch = self.shape_batches.get((mode, size, smooth))
+        if batch is None: batch = self.shape_batches[(mode, size, smooth)] = [numpy.empty(96, numpy.float32), 0]
+        _shape_batch_2d_add_(batch, vertices, indices, r, g, b, a)
+        return self
+
+    # Нарисовать точку:
+    def point(self, color: list, point: tuple, size: float) -> "ShapeBatch2D":
+        return self._add_("point", gl.GL_POINTS, float(size), False, color, [point])
+
+    # Нарисовать линию:
+    def line(self, color: list, point1: tuple, point2: tuple, width: float = 1, smooth: bool = False) -> "ShapeBatch2D":
+        return self._add_("line", gl.GL_LINES, float(width), bool(smooth), color, [point1, point2])
+
+    # Нарисовать ломаную линию:
+    def line_strip(self, color: list, points: list, width: float = 1, smooth: bool = False) -> "ShapeBatch2D":
+        if len(points) < 2: return self
+        return self._add_("line_strip", gl.GL_LINES, float(width), bool(smooth), color, points,
+                          ShapeBatch2D._get_indices_("strip", len(points)))
+
+    # Нарисовать замкнутую ломаную линию:
+    def line_loop(self, color: list, points: list, width: float = 1, smooth: bool = False) -> "ShapeBatch2D":
+        if len(points) < 2: return self
+        return self._add_("line_loop", gl.GL_LINES, float(width), bool(smooth), color, points,
+                          ShapeBatch2D._get_indices_("loop", len(points)))
+
+    # Нарисовать треугольники:
+    def triangles(self, color: list, vertices: list) -> "ShapeBatch2D":
+        count = len(vertices) - len(vertices) % 3
+        return self._add_("triangles", gl.GL_TRIANGLES, 0.0, False, color, vertices[:count])
+
+    # Нарисовать треугольники с общей стороной:
+    def triangle_strip(self, color: list, vertices: list) -> "ShapeBatch2D":
+        if len(vertices) < 3: return self
+        return self._add_("triangle_strip", gl.GL_TRIANGLES, 0.0, False, color, vertices,
+                          ShapeBatch2D._get_indices_("triangle_strip", len(vertices)))
+
+    # Нарисовать треугольники последняя вершина которой будет соединена с первой:
+    def triangle_fan(self, color: list, vertices: list) -> "ShapeBatch2D":
+        if len(vertices) < 3: return self
+        return self._add_("triangle_fan", gl.GL_TRIANGLES, 0.0, False, color, vertices,
+                          ShapeBatch2D._get_indices_("fan", len(vertices)))
+
+    # Нарисовать квадрат из каждых 4-х вершин:
+    def quads(self, color: list, vertices: list) -> "ShapeBatch2D":
+        if len(vertices) < 4: return self
+        return self._add_("quads", gl.GL_TRIANGLES, 0.0, False, color, vertices,
+                          ShapeBatch2D._get_indices_("quads", len(vertices)))
+
+    # Нарисовать квадрат из каждых 4-х вершин с общей стороной:
+    def quads_strip(self, color: list, vertices: list) -> "ShapeBatch2D":
+        if len(vertices) < 4: return self
+        return self._add_("quads_strip", gl.GL_TRIANGLES, 0.0, False, color, vertices,
+                          ShapeBatch2D._get_indices_("quads_strip", len(vertices)))
+
+    # Построить треугольники толстой ломаной линии (вершины (N, 2) и цвета (N, 4), по 3 вершины на треугольник):
+    @staticmethod
+    def tessellate_polyline(points:         list,
+                            width:          float,
+                            color:          list  = None,
+                            closed:         bool  = False,
+                            join:           str   = "miter",
+                            feather:        float = 0.0,
+                            miter_limit:    float = 4.0,
+                            round_segments: int   = None
+                            ) -> tuple:
+        """ Толщина и feather задаются в единицах мира, а не в пикселях (в отличие от glLineWidth).
+
+            join           - "miter": острые соединения (угол длиннее miter_limit толщин линии срезается, как bevel).
+                             "round": круглые соединения (дуга из round_segments треугольников на каждый угол).
+            feather        - Ширина полосы сглаживания по краям линии, в которой прозрачность плавно уходит в 0.
+            round_segments - Количество треугольников на половину круга. Если не указано, подбирается по толщине.
+        """
+
+        if join not in ("miter", "round"): raise ValueError(f"Unsupported join type: \"{join}\". Use \"miter\" or \"round\".")
+        r, g, b, a = (1.0, 1.0, 1.0, 1.0) if not color else (*color, 1.0)[:4]
+        empty = numpy.empty((0, 2), dtype=numpy.float64), numpy.empty((0, 4), dtype=numpy.float64)
+
+        # Убираем повторяющиеся подряд точки (у них нет направления):
+        points = numpy.asarray(points, dtype=numpy.float64)
+        points = points.reshape(len(points), -1)[:, :2] if points.size > 0 else points.reshape(0, 2)
+        if len(points) > 1: points = points[numpy.r_[True, numpy.any(numpy.diff(points, axis=0) != 0, axis=1)]]
+        if closed and len(points) > 2 and numpy.all(points[0] == points[-1]): points = points[:-1]
+        if len(points) < 2 or width <= 0: return empty
+        if len(points) < 3: closed = False
+
+        half     = width / 2.0
+        count    = len(points)
+        next_ids = (numpy.arange(count) + 1) % count if closed else numpy.arange(1, count)
+        segments = points[next_ids] - points[:len(next_ids)]
+        dirs     = segments / numpy.hypot(segments[:, 0], segments[:, 1])[:, None]
+        normals  = numpy.column_stack([-dirs[:, 1], dirs[:, 0]])  # Нормали смотрят влево от направления сегмента.
+
+        # Полосы поперёк линии (смещение вдоль нормали и прозрачность): край сглаживания, тело линии, край сглаживания:
+        if feather > 0: offsets, alphas = numpy.array([half + feather, half, -half, -half - feather]), numpy.array([0, 1, 1, 0.0])
+        else:           offsets, alphas = numpy.array([half, -half]), numpy.array([1.0, 1.0])
+
+        # Собрать четырёхугольники между рядами вершин начала (starts) и конца (ends) формы (полосы, сегменты, 2):
+        def build_quads(starts: numpy.ndarray, ends: numpy.ndarray) -> tuple:
+            quads = numpy.stack([starts[:-1], starts[1:], ends[1:], ends[1:], ends[:-1], starts[:-1]], axis=2)
+            quad_alphas = numpy.stack([alphas[:-1], alphas[1:], alphas[1:], alphas[1:], alphas[:-1], alphas[:-1]], axis=1)
+            return quads.reshape(-1, 2), numpy.repeat(quad_alphas[:, None, :], starts.shape[1], axis=1).ravel()
+
+        # Острые соединения: у каждой точки общее смещение вдоль биссектрисы нормалей соседних сегментов.
+        # Если угол длиннее miter_limit толщин, соединение срезается (bevel): сегменты идут полной толщины
+        # до самой точки, а снаружи угла их края соединяет треугольник:
+        if join == "miter":
+            prev_normals = numpy.roll(normals, 1, axis=0) if closed else numpy.vstack([normals[:1], normals])
+            next_normals = normals if closed else numpy.vstack([normals, normals[-1:]])
+            miters  = prev_normals + next_normals
+            lengths = numpy.hypot(miters[:, 0], miters[:, 1])
+            miters  = numpy.where(lengths[:, None] > 1e-6, miters / numpy.maximum(lengths, 1e-6)[:, None], next_normals)
+            scales  = 1.0 / numpy.maximum(numpy.sum(miters * next_normals, axis=1), 1e-6)
+            bevels  = (scales > miter_limit) | (lengths <= 1e-6)
+            miters *= scales[:, None]
+
+            # Смещения концов каждого сегмента (у срезанных соединений - собственная нормаль сегмента):
+            seg_ids   = numpy.arange(len(next_ids))
+            start_vec = numpy.where(bevels[seg_ids, None], normals, miters[seg_ids])
+            end_vec   = numpy.where(bevels[next_ids, None], normals, miters[next_ids])
+            starts    = points[seg_ids][None] + offsets[:, None, None] * start_vec[None]
+            ends      = points[next_ids][None] + offsets[:, None, None] * end_vec[None]
+            vertices, vertex_alphas = build_quads(starts, ends)
+
+            # Треугольники срезанных соединений (у незамкнутой линии крайние точки без соединений):
+            joint_ids = numpy.flatnonzero(bevels)
+            if not closed: joint_ids = joint_ids[(joint_ids > 0) & (joint_ids < count - 1)]
+            if len(joint_ids) > 0:
+                prev_seg = (joint_ids - 1) % len(next_ids)
+                next_seg = joint_ids % len(next_ids)
+                cross  = dirs[prev_seg, 0] * dirs[next_seg, 1] - dirs[prev_seg, 1] * dirs[next_seg, 0]
+                side   = numpy.where(cross > 0, -1.0, 1.0)[:, None]  # Срез строится с внешней стороны поворота.
+                center = points[joint_ids]
+                start, end = center + normals[prev_seg] * side * half, center + normals[next_seg] * side * half
+                tris = numpy.stack([center, start, end], axis=1)
+                vertices      = numpy.concatenate([vertices, tris.reshape(-1, 2)])
+                vertex_alphas = numpy.concatenate([vertex_alphas, numpy.ones(tris.size // 2)])
+
+                # Полоса сглаживания вдоль среза:
+                if feather > 0:
+                    outer_start = center + normals[prev_seg] * side * (half + feather)
+                    outer_end   = center + normals[next_seg] * side * (half + feather)
+                    band = numpy.stack([start, end, outer_end, outer_end, outer_start, start], axis=1)
+                    vertices      = numpy.concatenate([vertices, band.reshape(-1, 2)])
+                    vertex_alphas = numpy.concatenate([vertex_alphas, numpy.tile([1, 1, 0, 0, 0, 1.0], len(band))])
+
+        # Круглые соединения: каждый сегмент отдельно, а снаружи каждого угла дуга:
+        else:
+            shift = offsets[:, None, None] * normals[None, :, :]
+            vertices, vertex_alphas = build_quads(points[:len(next_ids)][None] + shift, points[next_ids][None] + shift)
+
+            # Углы между соседними сегментами (у незамкнутой линии крайние точки без соединений):
+            prev_ids = numpy.arange(count) if closed else numpy.arange(1, count - 1)
+            if len(prev_ids) > 0:
+                prev_seg = (prev_ids - 1) % len(next_ids)
+                next_seg = prev_ids % len(next_ids)
+                cross = dirs[prev_seg, 0] * dirs[next_seg, 1] - dirs[prev_seg, 1] * dirs[next_seg, 0]
+                side  = numpy.where(cross > 0, -1.0, 1.0)[:, None]  # Дуга строится с внешней стороны поворота.
+                start, end = normals[prev_seg] * side, normals[next_seg] * side
+                sweep = numpy.arctan2(start[:, 0] * end[:, 1] - start[:, 1] * end[:, 0], numpy.sum(start * end, axis=1))
+
+                if round_segments is None:
+                    round_segments = int(min(max(ceil(pi / acos(max(1.0 - 0.25 / half, -1.0))), 2), 32)) if half > 0.25 else 2
+                steps  = numpy.linspace(0.0, 1.0, round_segments + 1)
+                angles = numpy.arctan2(start[:, 1], start[:, 0])[:, None] + sweep[:, None] * steps[None, :]
+                ring   = numpy.stack([numpy.cos(angles), numpy.sin(angles)], axis=2)  # (соединения, шаги, 2).
+                center = points[prev_ids][:, None, :]
+
+                # Веер треугольников от точки соединения до дуги толщины линии:
+                inner = center + ring * half
+                fans = numpy.stack([numpy.broadcast_to(center, inner[:, 1:].shape), inner[:, :-1], inner[:, 1:]], axis=2)
+                vertices      = numpy.concatenate([vertices, fans.reshape(-1, 2)])
+                vertex_alphas = numpy.concatenate([vertex_alphas, numpy.ones(fans.size // 2)])
+
+                # Полоса сглаживания вдоль дуги:
+                if feather > 0:
+                    outer = center + ring * (half + feather)
+                    band = numpy.stack([inner[:, :-1], inner[:, 1:], outer[:, 1:], outer[:, 1:], outer[:, :-1], inner[:, :-1]], axis=2)
+                    vertices      = numpy.concatenate([vertices, band.reshape(-1, 2)])
+                    vertex_alphas = numpy.concatenate([vertex_alphas, numpy.tile([1, 1, 0, 0, 0, 1.0], band.size // 12)])
+
+        colors = numpy.empty((len(vertices), 4), dtype=numpy.float64)
+        colors[:, 0:3] = r, g, b
+        colors[:, 3]   = a * vertex_alphas
+        return vertices, colors
+
+    # Нарисовать толстую ломаную линию треугольниками (параметры как в tessellate_polyline):
+    def polyline(self,
+                 color:       list,
+                 points:      list,
+                 width:       float = 1,
+                 closed:      bool  = False,
+                 join:        str   = "miter",
+                 feather:     float = 0.0,
+                 miter_limit: float = 4.0
+                 ) -> "ShapeBatch2D":
+        if not self._is_begin_:
+            raise Exception(
+                "The \".begin()\" function was not called "
+                "before the \".polyline()\" function.")
+
+        vertices, colors = ShapeBatch2D.tessellate_polyline(points, width, color, closed, join, feather, miter_limit)
+        count = len(vertices)
+        if count == 0: return self
+
+        # Записываем вершины с их цветами в группу фигур с заливкой:
+        batch = self.shape_batches.get((gl.GL_TRIANGLES, 0.0, False))
+        if batch is None: batch = self.shape_batches[(gl.GL_TRIANGLES, 0.0, False)] = [numpy.empty(96, numpy.float32), 0]
+        used = batch[1]
+        if used + count * 6 > len(batch[0]): batch[0] = _grow_float_buffer_(batch[0], used, used + count * 6)
+        block = batch[0][used:used + count * 6].reshape(count, 6)
+        block[:, 0:2], block[:, 2:6] = vertices, colors
+        batch[1] = used + count * 6
+        return self
+
+    # Нарисовать многоугольник (выпуклый, как и в GL_POLYGON):
+    def polygon(self, color: list, vertices: list) -> "ShapeBatch2D":
+        if len(vertices) < 3: return self
+        return self._add_("polygon", gl.GL_TRIANGLES, 0.0, False, color, vertices,
+                          ShapeBatch2D._get_indices_("fan", len(vertices)))
+
+    # Закончить отрисовку:
+    def end(self) -> "ShapeBatch2D":
+        if self._is_begin_:
+            self._is_begin_ = False
+        else:
+            raise Exception("The \".begin()\" function was not called before the \".end()\" function.")
         return self
+
+    # Отрисовать все примитивы:
+    def render(self, clear_batch: bool = True) -> "ShapeBatch2D":
+        if self._is_begin_:
+            raise Exception(
+                "You cannot call the \".render()\" function after \".begin()\" and not earlier than \".end()\""
+            )
+
+        # Создаём потоковый буфер при первой отрисовке и резервируем в нём место под весь пакет:
+        if self.is_stream and self._stream_ is None: self._stream_ = StreamVBO()
+        stream = self._stream_ if self.is_stream else None
+        if stream is not None:
+            stream.begin()
+            stream.reserve(sum(batch[1] * 4 + 16 for batch in self.shape_batches.values()))
+
+        gl.glEnableClientState(gl.GL_VERTEX_ARRAY)
+        gl.glEnableClientState(gl.GL_COLOR_ARRAY)
+
+        # Рисуем каждую группу за один вызов (шаг вершины 24 байта):
+        for (mode, size, smooth), batch in sorted(self.shape_batches.items(),
+                                                  key=lambda item: ShapeBatch2D._MODE_ORDER_[item[0][0]]):
+            count = batch[1]
+            if count == 0: continue  # Группа пуста в этом кадре.
+
+            if   mode == gl.GL_POINTS: gl.glPointSize(size)
+            elif mode == gl.GL_LINES:  gl.glLineWidth(size)
+            if smooth: gl.glEnable(gl.GL_LINE_SMOOTH)
+
+            if stream is not None:
+                offset = stream.upload(batch[0][:count])
+                gl.glVertexPointer(2, gl.GL_FLOAT, 24, ctypes.c_void_p(offset))
+                gl.glColorPointer(4, gl.GL_FLOAT, 24, ctypes.c_void_p(offset + 8))
+            else:
+                gl.glVertexPointer(2, gl.GL_FLOAT, 24, batch[0][0:count])
+                gl.glColorPointer(4, gl.GL_FLOAT, 24, batch[0][2:count])
+
+            gl.glDrawArrays(mode, 0, count // 6)
+            if smooth: gl.glDisable(gl.GL_LINE_SMOOTH)
+            RenderStats.add(draw_calls=1, bytes_uploaded=count * 4)
+
+        if stream is not None: stream.end()
+        gl.glDisableClientState(gl.GL_COLOR_ARRAY)
+        gl.glDisableClientState(gl.GL_VERTEX_ARRAY)
+
+        # После массива цветов текущий цвет не определён, поэтому возвращаем белый:
+        gl.glColor(1, 1, 1, 1)
+
+        if clear_batch: self.clear()
+
+        return self
+
+    # Очистить пакет (буферы вершин остаются и будут переиспользованы в следующем кадре):
+    def clear(self) -> "ShapeBatch2D":
+        for batch in self.shape_batches.values(): batch[1] = 0
+        return self
+
+    # Освободить буферы вершин:
+    def destroy(self) -> None:
+        self.shape_batches.clear()
+        if self._stream_ is not None: self._stream_.destroy() ; self._stream_ = None
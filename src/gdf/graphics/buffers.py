@@ -128,12 +128,45 @@ class VBO:
             self.vertices = array.array("f", linear_list).tobytes()
         else: self.vertices = vertices
 
+        self.mode   = int(mode)
+        self.nbytes = self.vertices.nbytes if isinstance(self.vertices, np.ndarray) else len(self.vertices)
+        self.length = len(self.vertices)  # Длина данных в буфере (в тех же единицах, что и len(vertices)).
+
         gl.glBindBuffer(gl.GL_ARRAY_BUFFER, self.id)
-        gl.glBufferData(
-            gl.GL_ARRAY_BUFFER,
-            self.vertices.nbytes if isinstance(self.vertices, np.ndarray) else len(self.vertices),
-            self.vertices, int(mode)
-        )
+        gl.glBufferData(gl.GL_ARRAY_BUFFER, self.nbytes, self.vertices, self.mode)
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
+
+    # Обновить данные буфера начиная с offset байт (данные вне этого участка не меняются). Если новые данные
+    # больше буфера, он пересоздаётся с запасом вдвое, а данные до offset копируются в новый буфер:
+    def update(self, vertices: np.ndarray, offset: int = 0) -> "VBO":
+        nbytes = offset + vertices.nbytes
+        length = offset // (vertices.nbytes // len(vertices)) + len(vertices) if len(vertices) > 0 else offset
+
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, self.id)
+        if nbytes > self.nbytes:
+            capacity = max(nbytes, self.nbytes * 2)
+            if offset > 0:
+                buffer_id = gl.glGenBuffers(1)
+                gl.glBindBuffer(gl.GL_COPY_WRITE_BUFFER, buffer_id)
+                gl.glBufferData(gl.GL_COPY_WRITE_BUFFER, capacity, None, self.mode)
+                gl.glBindBuffer(gl.GL_COPY_READ_BUFFER, self.id)
+                gl.glCopyBufferSubData(gl.GL_COPY_READ_BUFFER, gl.GL_COPY_WRITE_BUFFER, 0, 0, min(offset, self.nbytes))
+                gl.glBindBuffer(gl.GL_COPY_READ_BUFFER, 0)
+                gl.glBindBuffer(gl.GL_COPY_WRITE_BUFFER, 0)
+                gl.glDeleteBuffers(1, [self.id])
+                self.id = buffer_id
+                gl.glBindBuffer(gl.GL_ARRAY_BUFFER, self.id)
+            else:
+                gl.glBufferData(gl.GL_ARRAY_BUFFER, capacity, None, self.mode)
+                self.length = 0  # Старые данные буфера удалены.
+            self.nbytes = capacity
+        gl.glBufferSubData(gl.GL_ARRAY_BUFFER, offset, vertices.nbytes, vertices)
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
+
+        # Частичное обновление не укорачивает данные. Сами данные запоминаем, только если они покрывают весь буфер:
+        if offset == 0 and length >= self.length: self.vertices = vertices
+        self.length = max(self.length, length)
+        return self
 
     # Отрисовать буфер:
     def render(self,
@@ -174,7 +207,7 @@ class VBO:
             offset += count * ctypes.sizeof(attr_type)
 
         # Отрисовка:
-        gl.glDrawArrays(draw_mode, 0, len(self.vertices) // triangle_vertices)
+        gl.glDrawArrays(draw_mode, 0, self.length // triangle_vertices)
 
         # Возвращаем настройки отрисовки по умолчанию:
         for i in range(len(attributes)): gl.glDisableVertexAttribArray(i)
@@ -188,3 +221,130 @@ class VBO:
     def destroy(self) -> None:
         gl.glDeleteBuffers(1, [self.id])
         self.id = None
+
+
+# Потоковый вершинный буфер (кольцевой буфер для вершин, которые меняются каждый кадр):
+class StreamVBO:
+    """ Данные пишутся друг за другом в свободную часть буфера без синхронизации с видеокартой.
+        Когда место заканчивается, старая память буфера отдаётся драйверу (orphaning), и запись начинается сначала.
+        Так видеокарта может дорисовывать старые данные, пока мы уже загружаем новые.
+    """
+
+    def __init__(self, size: int = 4 * 1024 * 1024) -> None:
+        self.id     = gl.glGenBuffers(1)
+        self.size   = int(size)  # Размер буфера в байтах.
+        self.offset = 0          # Смещение свободной части буфера в байтах.
+
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, self.id)
+        gl.glBufferData(gl.GL_ARRAY_BUFFER, self.size, None, gl.GL_STREAM_DRAW)
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
+
+    # Использовать буфер:
+    def begin(self) -> "StreamVBO":
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, self.id)
+        return self
+
+    # Перестать использовать буфер:
+    def end(self) -> "StreamVBO":
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
+        return self
+
+    # Отдать память буфера драйверу и начать запись сначала:
+    def orphan(self, size: int = None) -> "StreamVBO":
+        if size is not None: self.size = int(size)
+        gl.glBufferData(gl.GL_ARRAY_BUFFER, self.size, None, gl.GL_STREAM_DRAW)
+        self.offset = 0
+        return self
+
+    # Зарезервировать непрерывное место под nbytes байт (чтобы следующие загрузки не начали запись сначала):
+    def reserve(self, nbytes: int) -> "StreamVBO":
+        # Если данные больше всего буфера, увеличиваем его вдвое (пока они не поместятся):
+        if nbytes > self.size:
+            size = self.size
+            while size < nbytes: size *= 2
+            self.orphan(size)
+
+        # Если данные не помещаются в оставшуюся часть буфера, начинаем запись сначала:
+        elif self.offset + nbytes > self.size: self.orphan()
+        return self
+
+    # Загрузить данные в буфер (буфер должен быть привязан). Возвращает смещение данных в буфере в байтах:
+    def upload(self, data: np.ndarray) -> int:
+        data = np.ascontiguousarray(data)
+        nbytes = data.nbytes
+        if nbytes == 0: return self.offset
+        self.reserve(nbytes)
+
+        # Записываем данные в свободную часть буфера без ожидания видеокарты:
+        offset = self.offset
+        access = gl.GL_MAP_WRITE_BIT | gl.GL_MAP_INVALIDATE_RANGE_BIT | gl.GL_MAP_UNSYNCHRONIZED_BIT
+        pointer = gl.glMapBufferRange(gl.GL_ARRAY_BUFFER, offset, nbytes, access)
+        ctypes.memmove(pointer, data.ctypes.data, nbytes)
+        gl.glUnmapBuffer(gl.GL_ARRAY_BUFFER)
+
+        # Смещаем свободную часть буфера (с выравниванием по 16 байт):
+        self.offset = (offset + nbytes + 15) & ~15
+        return offset
+
+    # Удалить буфер:
+    def destroy(self) -> None:
+        gl.glDeleteBuffers(1, [self.id])
+        self.id = None
+
+
+# Общий индексный буфер квадратов (индексы 0, 1, 2, 2, 3, 0 для каждых 4-х вершин):
+class QuadIndexBuffer:
+    """ Позволяет рисовать квадраты из 4-х вершин как индексированные треугольники, без устаревшего GL_QUADS.
+        Буфер один на всех и растёт вдвое, когда квадратов становится больше, чем в нём помещается.
+    """
+
+    _shared_ = None  # Общий экземпляр буфера. Создаётся при первом обращении.
+
+    def __init__(self, quads: int = 4096) -> None:
+        self.id    = gl.glGenBuffers(1)
+        self.quads = 0  # Сколько квадратов помещается в буфер.
+        self.reserve(quads)
+
+    # Получить общий индексный буфер:
+    @staticmethod
+    def get() -> "QuadIndexBuffer":
+        if QuadIndexBuffer._shared_ is None: QuadIndexBuffer._shared_ = QuadIndexBuffer()
+        return QuadIndexBuffer._shared_
+
+    # Увеличить буфер вдвое (пока в него не поместится указанное количество квадратов):
+    def reserve(self, quads: int) -> "QuadIndexBuffer":
+        if quads <= self.quads: return self
+        size = max(self.quads, 1)
+        while size < quads: size *= 2
+
+        # Генерируем индексы всех квадратов:
+        indices = (np.arange(size, dtype=np.uint32)[:, None] * 4 +
+                   np.array([0, 1, 2, 2, 3, 0], dtype=np.uint32)).ravel()
+
+        gl.glBindBuffer(gl.GL_ELEMENT_ARRAY_BUFFER, self.id)
+        gl.glBufferData(gl.GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, gl.GL_STATIC_DRAW)
+        gl.glBindBuffer(gl.GL_ELEMENT_ARRAY_BUFFER, 0)
+        self.quads = size
+        return self
+
+    # Использовать буфер (quads - сколько квадратов будет нарисовано за один вызов, максимум):
+    def begin(self, quads: int = 0) -> "QuadIndexBuffer":
+        self.reserve(quads)
+        gl.glBindBuffer(gl.GL_ELEMENT_ARRAY_BUFFER, self.id)
+        return self
+
+    # Нарисовать квадраты (буфер должен быть привязан):
+    def draw(self, quads: int) -> "QuadIndexBuffer":
+        gl.glDrawElements(gl.GL_TRIANGLES, quads * 6, gl.GL_UNSIGNED_INT, None)
+        return self
+
+    # Перестать использовать буфер:
+    def end(self) -> "QuadIndexBuffer":
+        gl.glBindBuffer(gl.GL_ELEMENT_ARRAY_BUFFER, 0)
+        return self
+
+    # Удалить буфер:
+    def destroy(self) -> None:
+        gl.glDeleteBuffers(1, [self.id])
+        self.id = None
+        if QuadIndexBuffer._shared_ is self: QuadIndexBuffer._shared_ = None
@@ -5,25 +5,75 @@
 
 # Импортируем:
 from .gl import *
+from .stats import RenderStats
+from .batch import ShapeBatch2D
+from .camera import Camera2D, Camera3D
+from .buffers import VBO
+from . import _grow_float_buffer_
 from ..math import *
 
 
 # Класс отрисовки 2D примитивов:
 class Draw2D:
+    """ Если через set_batch() указан пакет ShapeBatch2D, все функции добавляют примитивы в него, а не рисуют их сразу.
+        Пакет нужно начать (.begin()) до вызовов Draw2D и отрисовать (.render()) после.
+    """
+
+    _batch_       = None  # Пакет примитивов, в который направляются все вызовы.
+    _camera_      = None  # Камера, по масштабу которой выбирается количество вершин кругов.
+    _unit_circle_ = {}    # Кэш вершин единичных кругов (количество вершин: массив (sin, cos) углов).
+
+    # Направить все вызовы в пакет примитивов (None - рисовать сразу):
+    @staticmethod
+    def set_batch(batch: ShapeBatch2D | None) -> None:
+        Draw2D._batch_ = batch
+
+    # Получить пакет примитивов, в который направляются вызовы:
+    @staticmethod
+    def get_batch() -> ShapeBatch2D | None:
+        return Draw2D._batch_
+
+    # Установить камеру, по масштабу которой выбирается количество вершин кругов и звёздочек (None - масштаб 1):
+    @staticmethod
+    def set_camera(camera: Camera2D | None) -> None:
+        Draw2D._camera_ = camera
+
+    # Получить вершины единичного круга (углы идут по часовой стрелке от оси Y, как и раньше):
+    @staticmethod
+    def _get_unit_circle_(num_vertices: int) -> numpy.ndarray:
+        unit = Draw2D._unit_circle_.get(num_vertices)
+        if unit is None:
+            angles = numpy.arange(num_vertices) * (2.0 * pi / num_vertices)
+            unit = Draw2D._unit_circle_[num_vertices] = numpy.column_stack([numpy.sin(angles), numpy.cos(angles)])
+        return unit
+
+    # Подобрать количество вершин круга по его радиусу на экране (отклонение от настоящего круга до 1/4 пикселя):
+    @staticmethod
+    def _get_num_vertices_(radius: float) -> int:
+        camera = Draw2D._camera_
+        if camera is not None and camera.zoom != 0: radius = radius / camera.zoom * 100 / camera.meter
+        radius = abs(radius)
+        if radius <= 0.25: return 8
+        num_vertices = int(ceil(pi / acos(1.0 - 0.25 / radius)) + 3) // 4 * 4  # Кратно 4, чтобы реже создавать таблицы.
+        return int(clamp(num_vertices, 8, 256))
+
     # Нарисовать точку:
     @staticmethod
     def point(color: list, point: tuple, size: float) -> None:
         if not color: color = [1, 1, 1]
+        if Draw2D._batch_ is not None: Draw2D._batch_.point(color, point, size) ; return
         gl.glPointSize(size)
         gl.glColor(*color)
         gl.glBegin(gl.GL_POINTS)
         gl.glVertex(*point)
         gl.glEnd()
+        RenderStats.add(draw_calls=1, bytes_uploaded=8)
 
     # Нарисовать линию:
     @staticmethod
     def line(color: list, point1: tuple, point2: tuple, width: float = 1, smooth: bool = False) -> None:
         if not color: color = [1, 1, 1]
+        if Draw2D._batch_ is not None: Draw2D._batch_.line(color, point1, point2, width, smooth) ; return
         if smooth: gl.glEnable(gl.GL_LINE_SMOOTH)
         gl.glLineWidth(width)
         gl.glColor(*color)
@@ -31,85 +81,122 @@ class Draw2D:
         gl.glVertex(*point1)
         gl.glVertex(*point2)
         gl.glEnd()
+        RenderStats.add(draw_calls=1, bytes_uploaded=16)
         if smooth: gl.glDisable(gl.GL_LINE_SMOOTH)
 
     # Нарисовать ломаную линию:
     @staticmethod
     def line_strip(color: list, points: list, width: float = 1, smooth: bool = False) -> None:
         if not color: color = [1, 1, 1]
+        if Draw2D._batch_ is not None: Draw2D._batch_.line_strip(color, points, width, smooth) ; return
         if smooth: gl.glEnable(gl.GL_LINE_SMOOTH)
         gl.glLineWidth(width)
         gl.glColor(*color)
         gl.glBegin(gl.GL_LINE_STRIP)
         for p in points: gl.glVertex(*p)
         gl.glEnd()
+        RenderStats.add(draw_calls=1, bytes_uploaded=len(points) * 8)
         if smooth: gl.glDisable(gl.GL_LINE_SMOOTH)
 
     # Нарисовать замкнутую ломаную линию:
     @staticmethod
     def line_loop(color: list, points: list, width: float = 1, smooth: bool = False) -> None:
         if not color: color = [1, 1, 1]
+        if Draw2D._batch_ is not None: Draw2D._batch_.line_loop(color, points, width, smooth) ; return
         if smooth: gl.glEnable(gl.GL_LINE_SMOOTH)
         gl.glLineWidth(width)
         gl.glColor(*color)
         gl.glBegin(gl.GL_LINE_LOOP)
         for p in points: gl.glVertex(*p)
         gl.glEnd()
+        RenderStats.add(draw_calls=1, bytes_uploaded=len(points) * 8)
         if smooth: gl.glDisable(gl.GL_LINE_SMOOTH)
 
+    # Нарисовать толстую ломаную линию треугольниками (без glLineWidth, толщина в единицах мира):
+    @staticmethod
+    def polyline(color: list, points: list, width: float = 1, closed: bool = False, join: str = "miter",
+                 feather: float = 0.0, miter_limit: float = 4.0) -> None:
+        if not color: color = [1, 1, 1]
+        if Draw2D._batch_ is not None:
+            Draw2D._batch_.polyline(color, points, width, closed, join, feather, miter_limit) ; return
+
+        vertices, colors = ShapeBatch2D.tessellate_polyline(points, width, color, closed, join, feather, miter_limit)
+        if len(vertices) == 0: return
+        gl.glEnableClientState(gl.GL_VERTEX_ARRAY)
+        gl.glEnableClientState(gl.GL_COLOR_ARRAY)
+        gl.glVertexPointer(2, gl.GL_DOUBLE, 0, vertices)
+        gl.glColorPointer(4, gl.GL_DOUBLE, 0, colors)
+        gl.glDrawArrays(gl.GL_TRIANGLES, 0, len(vertices))
+        gl.glDisableClientState(gl.GL_COLOR_ARRAY)
+        gl.glDisableClientState(gl.GL_VERTEX_ARRAY)
+        gl.glColor(1, 1, 1, 1)
+        RenderStats.add(draw_calls=1, bytes_uploaded=vertices.nbytes + colors.nbytes)
+
     # Нарисовать треугольники:
     @staticmethod
     def triangles(color: list, vertices: list) -> None:
         if not color: color = [1, 1, 1]
+        if Draw2D._batch_ is not None: Draw2D._batch_.triangles(color, vertices) ; return
         gl.glColor(*color)
         gl.glBegin(gl.GL_TRIANGLES)
         for v in vertices: gl.glVertex(*v)
         gl.glEnd()
+        RenderStats.add(draw_calls=1, bytes_uploaded=len(vertices) * 8)
 
     # Нарисовать треугольники с общей стороной:
     @staticmethod
     def triangle_strip(color: list, vertices: list) -> None:
         if not color: color = [1, 1, 1]
+        if Draw2D._batch_ is not None: Draw2D._batch_.triangle_strip(color, vertices) ; return
         gl.glColor(*color)
         gl.glBegin(gl.GL_TRIANGLE_STRIP)
         for v in vertices: gl.glVertex(*v)
         gl.glEnd()
+        RenderStats.add(draw_calls=1, bytes_uploaded=len(vertices) * 8)
 
     # Нарисовать треугольники последняя вершина которой будет соединена с первой:
     @staticmethod
     def triangle_fan(color: list, vertices: list) -> None:
         if not color: color = [1, 1, 1]
+        if Draw2D._batch_ is not None: Draw2D._batch_.triangle_fan(color, vertices) ; return
         gl.glColor(*color)
         gl.glBegin(gl.GL_TRIANGLE_FAN)
         for v in vertices: gl.glVertex(*v)
         gl.glEnd()
+        RenderStats.add(draw_calls=1, bytes_uploaded=len(vertices) * 8)
 
     # Нарисовать квадрат из каждых 4-х вершин:
     @staticmethod
     def quads(color: list, vertices: list) -> None:
         if not color: color = [1, 1, 1]
+        if Draw2D._batch_ is not None: Draw2D._batch_.quads(color, vertices) ; return
         gl.glColor(*color)
         gl.glBegin(gl.GL_QUADS)
         for v in vertices: gl.glVertex(*v)
         gl.glEnd()
+        RenderStats.add(draw_calls=1, quads=len(vertices) // 4, bytes_uploaded=len(vertices) * 8)
 
     # Нарисовать квадрат из каждых 4-х вершин с общей стороной:
     @staticmethod
     def quads_strip(color: list, vertices: list) -> None:
         if not color: color = [1, 1, 1]
+        if Draw2D._batch_ is not None: Draw2D._batch_.quads_strip(color, vertices) ; return
         gl.glColor(*color)
         gl.glBegin(gl.GL_QUAD_STRIP)
         for v in vertices: gl.glVertex(*v)
         gl.glEnd()
+        RenderStats.add(draw_calls=1, bytes_uploaded=len(vertices) * 8)
 
     # Нарисовать многоугольник:
     @staticmethod
     def polygon(color: list, vertices: list) -> None:
         if not color: color = [1, 1, 1]
+        if Draw2D._batch_ is not None: Draw2D._batch_.polygon(color, vertices) ; return
         gl.glColor(*color)
         gl.glBegin(gl.GL_POLYGON)
         for v in vertices: gl.glVertex2d(*v)
         gl.glEnd()
+        RenderStats.add(draw_calls=1, bytes_uploaded=len(vertices) * 8)
 
     # Нарисовать квадрат:
     @staticmethod
@@ -125,29 +212,31 @@ class Draw2D:
         x, y, w, h = point[0], point[1], size[0], size[1]
         Draw2D.quads(color, [(x, y), (x+w, y), (x+w, y+h), (x, y+h)])
 
-    # Нарисовать круг:
+    # Нарисовать круг (если num_vertices не указан, он подбирается по радиусу круга на экране):
     @staticmethod
     def circle(color: list, center: tuple, radius: float, width: float = 1,
                smooth: bool = False, num_vertices: int = None) -> None:
         if not color: color = [1, 1, 1]
-        if num_vertices is None: num_vertices = int(pi*2*radius)//180
+        if num_vertices is None: num_vertices = Draw2D._get_num_vertices_(radius)
         if num_vertices < 3: num_vertices = 3
-        vertices_list = []
-        for index in range(num_vertices):
-            rad_angle = radians((360/num_vertices)*index)
-            vertices_list.append([center[0]+sin(rad_angle)*radius, center[1]+cos(rad_angle)*radius])
-        Draw2D.line_loop(color, vertices_list, width, smooth)
+        vertices = Draw2D._get_unit_circle_(num_vertices) * radius + (center[0], center[1])
+        Draw2D.line_loop(color, vertices, width, smooth)
 
-    # Нарисовать круг с заливкой:
+    # Нарисовать круг с заливкой (если num_vertices не указан, он подбирается по радиусу круга на экране):
     @staticmethod
-    def circle_fill(color: list, center: tuple, radius: float, num_vertices: int = 24) -> None:
+    def circle_fill(color: list, center: tuple, radius: float, num_vertices: int = None) -> None:
         if not color: color = [1, 1, 1]
+        if num_vertices is None: num_vertices = Draw2D._get_num_vertices_(radius)
         if num_vertices < 3: num_vertices = 3
-        vertices_list = []
-        for index in range(num_vertices):
-            rad_angle = radians((360/num_vertices)*index)
-            vertices_list.append([center[0]+sin(rad_angle)*radius, center[1]+cos(rad_angle)*radius])
-        Draw2D.polygon(color, vertices_list)
+        vertices = Draw2D._get_unit_circle_(num_vertices) * radius + (center[0], center[1])
+        Draw2D.polygon(color, vertices)
+
+    # Получить вершины звёздочки (внешние и внутренние вершины чередуются):
+    @staticmethod
+    def _get_star_vertices_(center: tuple, outradius: float, inradius: float, num_vertices: int) -> numpy.ndarray:
+        unit = Draw2D._get_unit_circle_(num_vertices * 2)
+        radii = numpy.empty((num_vertices * 2, 1)) ; radii[0::2], radii[1::2] = outradius, inradius
+        return unit * radii + (center[0], center[1])
 
     # Нарисовать звёздочку:
     @staticmethod
@@ -155,25 +244,15 @@ class Draw2D:
              num_vertices: int = 5, width: float = 1, smooth: bool = False) -> None:
         if not color: color = [1, 1, 1]
         if num_vertices < 2: num_vertices = 2
-        vertices_list = []
-        for index in range(num_vertices*2):
-            radius = outradius if not index % 2 else inradius
-            rad_angle = radians(index*180/num_vertices)
-            vertices_list.append([center[0]+sin(rad_angle)*radius, center[1]+cos(rad_angle)*radius])
-        Draw2D.line_loop(color, vertices_list, width, smooth)
+        Draw2D.line_loop(color, Draw2D._get_star_vertices_(center, outradius, inradius, num_vertices), width, smooth)
 
     # Нарисовать звёздочку с заливкой:
     @staticmethod
     def star_fill(color: list, center: tuple, outradius: float, inradius: float, num_vertices: int = 5) -> None:
         if not color: color = [1, 1, 1]
         if num_vertices < 2: num_vertices = 2
-        vertices_list = []
-        for index in range(num_vertices*2+1):
-            radius = outradius if not index % 2 else inradius
-            rad_angle = radians(index*180/num_vertices)
-            vertices_list.append([center[0]+sin(rad_angle)*radius, center[1]+cos(rad_angle)*radius])
-            vertices_list.append(list(center))
-        Draw2D.triangle_strip(color, vertices_list)
+        vertices = Draw2D._get_star_vertices_(center, outradius, inradius, num_vertices)
+        Draw2D.triangle_fan(color, numpy.vstack([(center[0], center[1]), vertices, vertices[:1]]))
 
 
 # Класс отрисовки 3D примитивов:
@@ -278,3 +357,210 @@ class Draw3D:
         gl.glBegin(gl.GL_POLYGON)
         for v in vertices: gl.glVertex(*v)
         gl.glEnd()
+
+
+# Класс накопления 3D отладочной геометрии (линии, коробки, сферы, пирамиды видимости камер):
+class DebugDraw3D:
+    """ Вся геометрия хранится как линии (на вершину: x, y, z, r, g, b, a) и рисуется одним вызовом на группу:
+        одна группа с тестом глубины, другая поверх всего.
+
+        lifetime - Сколько секунд элемент остаётся на экране. 0 - только в этом кадре (буфер кадра очищается
+                   после отрисовки). Для бесконечного времени используйте float("inf"), а удалить элемент раньше
+                   можно через remove(). Долгоживущие элементы загружаются на видеокарту только когда их набор
+                   меняется, а не каждый кадр. Время жизни уменьшается в update(delta_time).
+    """
+
+    # Рёбра единичной коробки (углы от -0.5 до 0.5):
+    _BOX_EDGES_ = numpy.array([
+        [-1, -1, -1], [+1, -1, -1], [+1, -1, -1], [+1, +1, -1], [+1, +1, -1], [-1, +1, -1], [-1, +1, -1], [-1, -1, -1],
+        [-1, -1, +1], [+1, -1, +1], [+1, -1, +1], [+1, +1, +1], [+1, +1, +1], [-1, +1, +1], [-1, +1, +1], [-1, -1, +1],
+        [-1, -1, -1], [-1, -1, +1], [+1, -1, -1], [+1, -1, +1], [+1, +1, -1], [+1, +1, +1], [-1, +1, -1], [-1, +1, +1],
+    ], dtype=numpy.float64) * 0.5
+
+    _unit_spheres_ = {}  # Кэш линий единичных сфер (количество сегментов: вершины трёх окружностей).
+
+    # Группа геометрии с одним режимом теста глубины:
+    class DepthGroup:
+        def __init__(self) -> None:
+            self.frame      = [numpy.empty(7 * 64, dtype=numpy.float32), 0]   # [Вершины этого кадра, кол-во чисел].
+            self.persistent = numpy.empty(0, dtype=numpy.float32)             # Вершины долгоживущих элементов.
+            self.dirty      = True  # Изменился ли набор долгоживущих элементов.
+            self.vbo        = None  # Буфер на видеокарте: сначала долгоживущие вершины, затем вершины кадра.
+
+    def __init__(self, line_width: float = 1.0) -> None:
+        self.line_width    = line_width
+        self.groups        = {True: DebugDraw3D.DepthGroup(), False: DebugDraw3D.DepthGroup()}
+        self._items_       = {}  # Долгоживущие элементы (номер: [вершины, время удаления, тест глубины]).
+        self._next_handle_ = 0
+        self._time_        = 0.0           # Сколько времени прошло (сумма delta_time).
+        self._next_expire_ = float("inf")  # Ближайшее время удаления элемента.
+
+    # Добавить линии (каждые 2 вершины это линия). Возвращает номер долгоживущего элемента или None:
+    def _add_(self, vertices: numpy.ndarray, color: list, lifetime: float, depth_test: bool) -> int | None:
+        vertices = numpy.asarray(vertices, dtype=numpy.float64).reshape(-1, 3)
+        count = len(vertices)
+        if count == 0: return None
+        color = (1.0, 1.0, 1.0, 1.0) if not color else (*color, 1.0)[:4]
+        group = self.groups[bool(depth_test)]
+
+        # Геометрия только этого кадра пишется в буфер кадра:
+        if lifetime <= 0:
+            frame = group.frame
+            used = frame[1]
+            if used + count * 7 > len(frame[0]): frame[0] = _grow_float_buffer_(frame[0], used, used + count * 7)
+            block = frame[0][used:used + count * 7].reshape(count, 7)
+            block[:, 0:3], block[:, 3:7] = vertices, color
+            frame[1] = used + count * 7
+            return None
+
+        # Иначе запоминаем элемент до истечения его времени жизни:
+        data = numpy.empty((count, 7), dtype=numpy.float32)
+        data[:, 0:3], data[:, 3:7] = vertices, color
+        handle = self._next_handle_
+        self._next_handle_ += 1
+        self._items_[handle] = [data.ravel(), self._time_ + lifetime, bool(depth_test)]
+        if self._time_ + lifetime < self._next_expire_: self._next_expire_ = self._time_ + lifetime
+        group.dirty = True
+        return handle
+
+    # Нарисовать линию:
+    def line(self, point1: list, point2: list, color: list = None,
+             lifetime: float = 0.0, depth_test: bool = True) -> int | None:
+        return self._add_([point1, point2], color, lifetime, depth_test)
+
+    # Нарисовать линии (каждые 2 точки это линия, массив формы (N, 3) или (N, 2, 3)):
+    def lines(self, points: numpy.ndarray | list, color: list = None,
+              lifetime: float = 0.0, depth_test: bool = True) -> int | None:
+        return self._add_(points, color, lifetime, depth_test)
+
+    # Нарисовать ломаную линию (например путь):
+    def line_strip(self, points: numpy.ndarray | list, color: list = None, closed: bool = False,
+                   lifetime: float = 0.0, depth_test: bool = True) -> int | None:
+        points = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 3)
+        if len(points) < 2: return None
+        ends = numpy.roll(points, -1, axis=0) if closed else points[1:]
+        return self._add_(numpy.stack([points[:len(ends)], ends], axis=1), color, lifetime, depth_test)
+
+    # Нарисовать коробку по центру и размеру:
+    def box(self, center: list, size: list, color: list = None,
+            lifetime: float = 0.0, depth_test: bool = True) -> int | None:
+        vertices = DebugDraw3D._BOX_EDGES_ * numpy.asarray(size, dtype=numpy.float64)[:3] + numpy.asarray(center)[:3]
+        return self._add_(vertices, color, lifetime, depth_test)
+
+    # Нарисовать коробку по двум противоположным углам:
+    def aabb(self, min_point: list, max_point: list, color: list = None,
+             lifetime: float = 0.0, depth_test: bool = True) -> int | None:
+        min_point, max_point = numpy.asarray(min_point, dtype=numpy.float64), numpy.asarray(max_point, dtype=numpy.float64)
+        return self.box((min_point + max_point) / 2, max_point - min_point, color, lifetime, depth_test)
+
+    # Нарисовать сферу (три окружности по осям):
+    def sphere(self, center: list, radius: float, color: list = None, segments: int = 24,
+               lifetime: float = 0.0, depth_test: bool = True) -> int | None:
+        unit = DebugDraw3D._unit_spheres_.get(segments)
+        if unit is None:
+            angles = numpy.arange(segments + 1) * (2.0 * pi / segments)
+            sn, cs, zeros = numpy.sin(angles), numpy.cos(angles), numpy.zeros(segments + 1)
+            rings = [numpy.column_stack(axes) for axes in ((cs, sn, zeros), (cs, zeros, sn), (zeros, cs, sn))]
+            unit = numpy.concatenate([numpy.stack([ring[:-1], ring[1:]], axis=1).reshape(-1, 3) for ring in rings])
+            DebugDraw3D._unit_spheres_[segments] = unit
+        return self._add_(unit * radius + numpy.asarray(center, dtype=numpy.float64)[:3], color, lifetime, depth_test)
+
+    # Нарисовать пирамиду видимости камеры (по её матрицам из OpenGL):
+    def frustum(self, camera: Camera3D, color: list = None,
+                lifetime: float = 0.0, depth_test: bool = True) -> int | None:
+        # Матрицы OpenGL хранятся по столбцам, поэтому транспонируем их:
+        projection = numpy.asarray(camera.projection, dtype=numpy.float64).reshape(4, 4).T
+        modelview  = numpy.asarray(camera.modelview,  dtype=numpy.float64).reshape(4, 4).T
+        inverse    = numpy.linalg.inv(projection @ modelview)
+
+        # Переводим углы куба нормализованных координат (от -1 до 1) в мировые координаты:
+        corners = numpy.column_stack([DebugDraw3D._BOX_EDGES_ * 2.0, numpy.ones(len(DebugDraw3D._BOX_EDGES_))])
+        corners = corners @ inverse.T
+        return self._add_(corners[:, :3] / corners[:, 3:4], color, lifetime, depth_test)
+
+    # Удалить долгоживущий элемент:
+    def remove(self, handle: int) -> "DebugDraw3D":
+        item = self._items_.pop(handle, None)
+        if item is not None: self.groups[item[2]].dirty = True
+        return self
+
+    # Обновить время жизни элементов:
+    def update(self, delta_time: float) -> "DebugDraw3D":
+        self._time_ += delta_time
+        if self._time_ < self._next_expire_: return self
+
+        # Удаляем истёкшие элементы и ищем следующее время удаления:
+        self._next_expire_ = float("inf")
+        for handle, item in list(self._items_.items()):
+            if item[1] <= self._time_: self.remove(handle)
+            elif item[1] < self._next_expire_: self._next_expire_ = item[1]
+        return self
+
+    # Отрисовать всю геометрию (clear_frame - очистить геометрию этого кадра после отрисовки):
+    def render(self, clear_frame: bool = True) -> "DebugDraw3D":
+        depth_enabled = gl.glIsEnabled(gl.GL_DEPTH_TEST)
+        gl.glLineWidth(self.line_width)
+        gl.glEnableClientState(gl.GL_VERTEX_ARRAY)
+        gl.glEnableClientState(gl.GL_COLOR_ARRAY)
+
+        for depth_test, group in self.groups.items():
+            # Собираем вершины долгоживущих элементов заново, только если их набор изменился:
+            upload_all = group.dirty or group.vbo is None
+            if group.dirty:
+                arrays = [item[0] for item in self._items_.values() if item[2] == depth_test]
+                group.persistent = numpy.concatenate(arrays) if arrays else numpy.empty(0, dtype=numpy.float32)
+                group.dirty = False
+
+            frame = group.frame[0][:group.frame[1]]
+            count = (len(group.persistent) + len(frame)) // 7
+            if count == 0: continue
+
+            # Загружаем на видеокарту всё или только вершины этого кадра (после долгоживущих):
+            if group.vbo is None: group.vbo = VBO(numpy.empty(7 * 1024, dtype=numpy.float32), gl.GL_DYNAMIC_DRAW)
+            if upload_all or group.persistent.nbytes + frame.nbytes > group.vbo.nbytes:
+                data = numpy.concatenate([group.persistent, frame])
+                group.vbo.update(data)
+            else:
+                data = frame
+                if len(frame) > 0: group.vbo.update(frame, group.persistent.nbytes)
+
+            if depth_test: gl.glEnable(gl.GL_DEPTH_TEST)
+            else:          gl.glDisable(gl.GL_DEPTH_TEST)
+
+            # Рисуем всю группу за один вызов (шаг вершины 28 байт):
+            gl.glBindBuffer(gl.GL_ARRAY_BUFFER, group.vbo.id)
+            gl.glVertexPointer(3, gl.GL_FLOAT, 28, ctypes.c_void_p(0))
+            gl.glColorPointer(4, gl.GL_FLOAT, 28, ctypes.c_void_p(12))
+            gl.glDrawArrays(gl.GL_LINES, 0, count)
+            RenderStats.add(draw_calls=1, bytes_uploaded=data.nbytes)
+
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
+        gl.glDisableClientState(gl.GL_COLOR_ARRAY)
+        gl.glDisableClientState(gl.GL_VERTEX_ARRAY)
+        if depth_enabled: gl.glEnable(gl.GL_DEPTH_TEST)
+        else:             gl.glDisable(gl.GL_DEPTH_TEST)
+
+        # После массива цветов текущий цвет не определён, поэтому возвращаем белый:
+        gl.glColor(1, 1, 1, 1)
+
+        if clear_frame: self.clear_frame()
+
+        return self
+
+    # Очистить геометрию этого кадра:
+    def clear_frame(self) -> "DebugDraw3D":
+        for group in self.groups.values(): group.frame[1] = 0
+        return self
+
+    # Очистить всю геометрию (и долгоживущую тоже):
+    def clear(self) -> "DebugDraw3D":
+        self._items_.clear()
+        self._next_expire_ = float("inf")
+        for group in self.groups.values(): group.frame[1] = 0 ; group.dirty = True
+        return self
+
+    # Удалить буферы на видеокарте:
+    def destroy(self) -> None:
+        self.clear()
+        for group in self.groups.values():
+            if group.vbo is not None: group.vbo.destroy() ; group.vbo = None
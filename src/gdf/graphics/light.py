@@ -10,7 +10,9 @@ from .shader import ShaderProgram
 from .sprite import Sprite2D
 from .texture import Texture
 from .renderer import Renderer2D
-from .batch import SpriteBatch2D
+from .batch import Batch2D
+from .buffers import VBO
+from .stats import RenderStats
 from ..math import *
 
 
@@ -31,10 +33,14 @@ class Light2D:
             self.intensity           = intensity           # Яркость всего освещения.
             self.mix_level           = mix_level           # Сила смешивания окружающего света и источников света.
             self.lights              = []                  # Список источников света.
-            self.batch               = SpriteBatch2D()     # Пакетная отрисовка спрайтов.
+            self.batch               = Batch2D()           # Пакетная отрисовка спрайтов.
             self.ambient_framebuffer = Renderer2D(camera)  # Кадровый буфер окружающего освещения.
             self.light_framebuffer   = Renderer2D(camera)  # Кадровый буфер источников света.
 
+            # Записи точечных источников света и их буфер на видеокарте (буфер создаётся при первой отрисовке):
+            self._point_records_ = numpy.empty((0, 11), numpy.float32)
+            self._point_vbo_     = None
+
             # Шейдер:
             self.shader = ShaderProgram(
                 vert="""
@@ -109,30 +115,33 @@ class Light2D:
             # Начинаем рисовать источники света:
             self.light_framebuffer.begin()
 
-            # Рисуем источники света:
+            # Общий цвет белых спрайтовых источников света (цветные рисуются своим цветом):
+            tint = [1, 1, 1] if color is None else color
+
+            # Рисуем источники света в порядке списка. Подряд идущие точечные источники рисуются одним вызовом,
+            # а подряд идущие спрайтовые - одним пакетом (цвет каждого света идёт в пакет вместе с его вершинами):
+            points, sprites = [], 0
             self.batch.begin()
             for light in self.lights:
                 if type(light) is Light2D.PointLight:
-                    light._render_()
+                    if sprites > 0:
+                        self.batch.end() ; self.batch.render() ; self.batch.begin()
+                        sprites = 0
+                    points.append(light)
 
-                # Если это спрайтовый источник света:
                 elif type(light) is Light2D.SpriteLight:
-                    if light.color == [1, 1, 1]:
-                        self.batch.draw(
-                            light.sprite,
-                            light.position.x - light.size.x / 2,
-                            light.position.y - light.size.y / 2,
-                            light.size.x, light.size.y, light.angle
-                        )
-                    else:
-                        light.sprite.render(
-                            light.position.x - light.size.x / 2,
-                            light.position.y - light.size.y / 2,
-                            light.size.x, light.size.y,
-                            light.angle, light.color
-                        )
+                    if points: Light2D.PointLight._render_all_(self, points) ; points = []
+                    self.batch.draw(
+                        light.sprite,
+                        light.position.x - light.size.x / 2,
+                        light.position.y - light.size.y / 2,
+                        light.size.x, light.size.y, light.angle,
+                        tint if tuple(light.color)[:3] == (1, 1, 1) else light.color
+                    )
+                    sprites += 1
             self.batch.end()
-            self.batch.render(color)
+            if points: Light2D.PointLight._render_all_(self, points)
+            if sprites > 0: self.batch.render()
 
             # Рисуем слой света:
             self.light_framebuffer.end()
@@ -145,15 +154,25 @@ class Light2D:
             self.shader.set_uniform  ("u_mix_level",       self.mix_level)         # Смешивание света и окружения.
             self.ambient_framebuffer.render_shader()
             self.shader.end()
+            RenderStats.add(draw_calls=1, texture_binds=2)
 
             return self
 
         # Удаляем световое окружение:
         def destroy(self) -> None:
             self.shader.destroy()
+            if self._point_vbo_ is not None: self._point_vbo_.destroy() ; self._point_vbo_ = None
 
     # Класс точечного источника света:
     class PointLight:
+        """ Подряд идущие в списке слоя точечные источники света рисуются одним вызовом glDrawArraysInstanced
+            общим шейдером (порядок источников в списке сохраняется).
+            На видеокарту загружается одна запись на источник (позиция, радиусы, яркость и два цвета, всего 44 байта),
+            а квадрат источника строится в вершинном шейдере. Переменные камеры задаются один раз на вызов.
+        """
+
+        _shader_ = None  # Общий шейдер точечных источников света. Создаётся при первой отрисовке.
+
         def __init__(self,
                      layer:        "Light2D.LightLayer",
                      position:     vec2,
@@ -166,72 +185,6 @@ class Light2D:
             if color_inner is None: color_inner = [1, 1, 1]
             if color_outer is None: color_outer = [1, 1, 1]
 
-            # Вершинный шейдер:
-            vertex_shader = """
-            #version 330 core
-
-            // Матрицы камеры:
-            uniform mat4 u_modelview;
-            uniform mat4 u_projection;
-
-            // Позиция вершины:
-            layout (location = 0) in vec3 a_position;
-
-            // Основная функция:
-            void main(void) {
-                gl_Position = u_projection * u_modelview * vec4(a_position, 1.0);
-            }
-            """
-
-            # Фрагментный шейдер:
-            fragment_shader = """
-            #version 330 core
-
-            // Входные переменные:
-            uniform vec2  u_resolution;     // Размер окна.
-            uniform vec2  u_cam_position;   // Позиция камеры.
-            uniform float u_cam_zoom;       // Масштаб камеры.
-
-            // Параметры источника света:
-            uniform vec2  u_position;       // Позиция источника света.
-            uniform float u_intensity;      // Сила альфа канала внутри круга.
-            uniform vec4  u_ambient_color;  // Фоновый цвет света.
-            uniform vec3  u_color_inner;    // Цвет источника света внутри.
-            uniform vec3  u_color_outer;    // Цвет источника света снаружи.
-            uniform float u_inner_radius;   // Внутренний радиус.
-            uniform float u_outer_radius;   // Внешний радиус.
-
-            // Выходной цвет:
-            out vec4 FragColor;
-
-            // Основная функция:
-            void main(void) {
-                // Настраиваем систему координат шейдера:
-                vec2 position = (u_position - u_cam_position) * (1.0 / u_cam_zoom);
-                vec2 uv = (((gl_FragCoord.xy - position) / u_resolution.xy) - 0.5) * u_resolution.xy * 2;
-
-                vec3  color;  // Финальный цвет пикселя.
-                float alpha;  // Альфа финального пикселя.
-
-                float inner_rad = u_inner_radius * (1.0 / u_cam_zoom);  // Настраиваем внутренний радиус.
-                float outer_rad = u_outer_radius * (1.0 / u_cam_zoom);  // Настраиваем наружный радиус.
-
-                // Если вдруг внутренний радиус будет больше чем наружный:
-                if (inner_rad >= outer_rad) {
-                    inner_rad = outer_rad;
-                }
-
-                // Вычисляем альфа канал:
-                alpha = smoothstep(inner_rad, outer_rad, length(uv));
-
-                // Вычисляем цвет пикселя:
-                color = mix(u_color_inner, u_color_outer, alpha);
-
-                // Задаём окончательный цвет:
-                FragColor = vec4(color.rgb, 1.0 - alpha) * min(u_intensity * 0.9, 0.9);
-            }
-            """
-
             self.layer        = layer         # Слой освещения.
             self.position     = position      # Позиция источника света.
             self.intensity    = intensity     # Интенсивность света.
@@ -240,44 +193,132 @@ class Light2D:
             self.inner_radius = inner_radius  # Внутренний радиус освещения.
             self.outer_radius = outer_radius  # Внешний радиус освещения.
 
-            # Шейдер источника света:
-            self.shader = ShaderProgram(frag=fragment_shader, vert=vertex_shader).compile()
-
             # Добавляем этот источник света в список источников света:
             self.layer.lights.append(self)
 
-        # Отрисовать источник света:
-        def _render_(self) -> None:
+        # Создать общий шейдер:
+        @staticmethod
+        def _get_shader_() -> ShaderProgram:
+            if Light2D.PointLight._shader_ is None:
+                Light2D.PointLight._shader_ = ShaderProgram(
+                    vert="""
+                        #version 330 core
+
+                        // Матрицы камеры:
+                        uniform mat4 u_modelview;
+                        uniform mat4 u_projection;
+
+                        // Параметры источника света (одна запись на источник):
+                        layout (location = 0) in vec4 a_light;        // Позиция, внутренний и внешний радиусы.
+                        layout (location = 1) in float a_intensity;   // Сила альфа канала внутри круга.
+                        layout (location = 2) in vec3 a_color_inner;  // Цвет источника света внутри.
+                        layout (location = 3) in vec3 a_color_outer;  // Цвет источника света снаружи.
+
+                        flat out vec4  v_light;
+                        flat out float v_intensity;
+                        flat out vec3  v_color_inner;
+                        flat out vec3  v_color_outer;
+
+                        // Основная функция:
+                        void main(void) {
+                            // Угол квадрата по номеру вершины: (0, 0), (1, 0), (0, 1), (1, 1):
+                            vec2 corner = vec2(gl_VertexID & 1, gl_VertexID >> 1);
+                            vec2 vertex = a_light.xy + (corner - 0.5) * a_light.w;
+
+                            v_light       = a_light;
+                            v_intensity   = a_intensity;
+                            v_color_inner = a_color_inner;
+                            v_color_outer = a_color_outer;
+                            gl_Position   = u_projection * u_modelview * vec4(vertex, 0.0, 1.0);
+                        }
+                    """,
+                    frag="""
+                        #version 330 core
+
+                        // Входные переменные:
+                        uniform vec2  u_resolution;    // Размер окна.
+                        uniform vec2  u_cam_position;  // Позиция камеры.
+                        uniform float u_cam_zoom;      // Масштаб камеры.
+
+                        // Параметры источника света:
+                        flat in vec4  v_light;
+                        flat in float v_intensity;
+                        flat in vec3  v_color_inner;
+                        flat in vec3  v_color_outer;
+
+                        // Выходной цвет:
+                        out vec4 FragColor;
+
+                        // Основная функция:
+                        void main(void) {
+                            // Настраиваем систему координат шейдера:
+                            vec2 position = (v_light.xy - u_cam_position) * (1.0 / u_cam_zoom);
+                            vec2 uv = (((gl_FragCoord.xy - position) / u_resolution.xy) - 0.5) * u_resolution.xy * 2;
+
+                            float inner_rad = v_light.z * (1.0 / u_cam_zoom);  // Настраиваем внутренний радиус.
+                            float outer_rad = v_light.w * (1.0 / u_cam_zoom);  // Настраиваем наружный радиус.
+
+                            // Если вдруг внутренний радиус будет больше чем наружный:
+                            inner_rad = min(inner_rad, outer_rad);
+
+                            // Вычисляем альфа канал и цвет пикселя:
+                            float alpha = smoothstep(inner_rad, outer_rad, length(uv));
+                            vec3  color = mix(v_color_inner, v_color_outer, alpha);
+
+                            // Задаём окончательный цвет:
+                            FragColor = vec4(color.rgb, 1.0 - alpha) * min(v_intensity * 0.9, 0.9);
+                        }
+                    """
+                ).compile()
+            return Light2D.PointLight._shader_
+
+        # Отрисовать все точечные источники света слоя за один вызов:
+        @staticmethod
+        def _render_all_(layer: "Light2D.LightLayer", lights: list) -> None:
             """ Эта функция не нуждается в ручном вызове. Она вызывается в слое света автоматически. """
 
-            self.shader.begin()
+            count = len(lights)
+            if count == 0: return
+
+            # Собираем записи источников (x, y, внутр. радиус, внеш. радиус, яркость, цвет внутри, цвет снаружи):
+            capacity = len(layer._point_records_)
+            if capacity < count: layer._point_records_ = numpy.empty((int(max(count, capacity * 2)), 11), numpy.float32)
+            records = layer._point_records_[:count]
+            records[:] = [(
+                light.position.x, light.position.y, light.inner_radius, light.outer_radius, light.intensity,
+                *tuple(light.color_inner)[:3], *tuple(light.color_outer)[:3]) for light in lights]
+
+            if layer._point_vbo_ is None: layer._point_vbo_ = VBO(records, gl.GL_STREAM_DRAW)
+            else: layer._point_vbo_.update(records)
+
+            # Переменные камеры задаются один раз на все источники:
+            shader = Light2D.PointLight._get_shader_()
+            shader.begin()
+            shader.set_uniform("u_modelview",    layer.camera.modelview)
+            shader.set_uniform("u_projection",   layer.camera.projection)
+            shader.set_uniform("u_resolution",   [layer.camera.width, layer.camera.height])
+            shader.set_uniform("u_cam_position", layer.camera.position.xy)
+            shader.set_uniform("u_cam_zoom",     layer.camera.zoom)
+
+            # Рисуем все источники за один вызов (шаг записи 44 байта):
+            gl.glBindBuffer(gl.GL_ARRAY_BUFFER, layer._point_vbo_.id)
+            for i, (size, offset) in enumerate(((4, 0), (1, 16), (3, 20), (3, 32))):
+                gl.glEnableVertexAttribArray(i)
+                gl.glVertexAttribDivisor(i, 1)
+                gl.glVertexAttribPointer(i, size, gl.GL_FLOAT, gl.GL_FALSE, 44, ctypes.c_void_p(offset))
+            gl.glDrawArraysInstanced(gl.GL_TRIANGLE_STRIP, 0, 4, count)
+            RenderStats.add(draw_calls=1, quads=count, bytes_uploaded=records.nbytes)
+
+            for i in range(4):
+                gl.glVertexAttribDivisor(i, 0)
+                gl.glDisableVertexAttribArray(i)
+            gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
+            shader.end()
 
-            # Устанавливаем переменные шейдера:
-            # Входные переменные:
-            self.shader.set_uniform("u_modelview",     self.layer.camera.modelview)
-            self.shader.set_uniform("u_projection",    self.layer.camera.projection)
-            self.shader.set_uniform("u_resolution",    [self.layer.camera.width, self.layer.camera.height])
-            self.shader.set_uniform("u_cam_position",  self.layer.camera.position.xy)
-            self.shader.set_uniform("u_cam_zoom",      self.layer.camera.zoom)
-
-            # Параметры источника света:
-            self.shader.set_uniform("u_position",      self.position.xy)
-            self.shader.set_uniform("u_intensity",     self.intensity)
-            self.shader.set_uniform("u_ambient_color", self.layer.ambient)
-            self.shader.set_uniform("u_color_inner",   self.color_inner)
-            self.shader.set_uniform("u_color_outer",   self.color_outer)
-            self.shader.set_uniform("u_inner_radius",  float(self.inner_radius))
-            self.shader.set_uniform("u_outer_radius",  float(self.outer_radius))
-
-            # Рисуем шейдер:
-            w = h = self.outer_radius / 2 ; x, y = self.position.xy
-            verts = [(-w + x, -h + y), (+w + x, -h + y), (+w + x, +h + y), (-w + x, +h + y)]
-
-            gl.glColor(1, 1, 1)
-            gl.glBegin(gl.GL_QUADS)
-            for i in range(4): gl.glVertex(*verts[i])
-            gl.glEnd()
-            self.shader.end()
+        # Отрисовать источник света:
+        def _render_(self) -> None:
+            """ Эта функция не нуждается в ручном вызове. Она вызывается в слое света автоматически. """
+            Light2D.PointLight._render_all_(self.layer, [self])
 
         # Удалить этот источник света из слоя света:
         def destroy(self) -> None:
@@ -4,8 +4,11 @@
 
 
 # Импортируем:
-from .batch import SpriteBatch2D
+import time
+from .batch import SpriteBatch2D, AtlasTextureBatch2D
+from .camera import Camera2D
 from .texture import Texture
+from .atlas import AtlasTexture
 from ..math import *
 from ..utils import Utils2D
 
@@ -34,6 +37,11 @@ class ParticleEffect2D:
             spawn_in      = ParticleEffect2D.SpawnInPoint(),
             custom_update = None
         ).create()
+
+        У каждого спавнера есть sample(n, rng), который возвращает сразу n позиций и n направлений
+        (массивы NumPy формы (n, 2)) из генератора numpy.random.Generator эффекта. Через него создаются все
+        частицы эффекта, поэтому с одним и тем же зерном (seed) эффект повторяется. Спавнер без sample() тоже
+        подходит, тогда get_position() и get_direction() вызываются для каждой частицы.
     """
 
     """ Пример кастомной функции обновления частиц:
@@ -42,18 +50,34 @@ class ParticleEffect2D:
                 particle.position.xy += particle.velocity.xy * delta_time
     """
 
+    # Получить n случайных единичных направлений:
+    @staticmethod
+    def _random_directions_(n: int, rng: numpy.random.Generator) -> numpy.ndarray:
+        a = rng.uniform(0, 2*math.pi, n)
+        return numpy.column_stack((numpy.sin(a), numpy.cos(a)))
+
+    # Нормализовать направления от центра спавнера (нулевые остаются нулевыми):
+    @staticmethod
+    def _directions_out_(positions: numpy.ndarray) -> numpy.ndarray:
+        length = numpy.hypot(positions[:, 0], positions[:, 1])
+        return positions / numpy.where(length > 0.0, length, 1.0)[:, None]
+
     # Создать частицу в точке:
     class SpawnInPoint:
         def __init__(self) -> None:
             pass
 
+        # Получить позиции и направления n частиц:
+        def sample(self, n: int, rng: numpy.random.Generator) -> tuple[numpy.ndarray, numpy.ndarray]:
+            return numpy.zeros((n, 2)), ParticleEffect2D._random_directions_(n, rng)
+
         # Получить позицию частицы:
-        def get_position(self) -> vec2:
+        def get_position(self, rng: numpy.random.Generator = None) -> vec2:
             return vec2(0.0)
 
-        # Получить направление частицы:
-        def get_direction(self, orig_pos: vec2, spawn_pos: vec2) -> vec2:
-            a = random.uniform(0, 2*math.pi)
+        # Получить направление частицы (rng - генератор случайных чисел, по умолчанию модуль random):
+        def get_direction(self, orig_pos: vec2, spawn_pos: vec2, rng: numpy.random.Generator = None) -> vec2:
+            a = (random if rng is None else rng).uniform(0, 2*math.pi)
             return vec2(sin(a), cos(a))
 
     # Создать частицу в круге:
@@ -62,17 +86,24 @@ class ParticleEffect2D:
             self.radius  = radius
             self.dir_out = dir_out
 
-        # Получить позицию частицы:
-        def get_position(self) -> vec2:
-            a = random.uniform(0, 2*math.pi)
+        # Получить позицию частицы (rng - генератор случайных чисел, по умолчанию модуль random):
+        def get_position(self, rng: numpy.random.Generator = None) -> vec2:
+            rng = random if rng is None else rng
+            a = rng.uniform(0, 2*math.pi)
             d = vec2(sin(a), cos(a))
-            return d * (self.radius*random.uniform(0, 1))
+            return d * (self.radius*rng.uniform(0, 1))
+
+        # Получить позиции и направления n частиц (направление наружу это направление от центра круга):
+        def sample(self, n: int, rng: numpy.random.Generator) -> tuple[numpy.ndarray, numpy.ndarray]:
+            d = ParticleEffect2D._random_directions_(n, rng)
+            positions = d * (self.radius * rng.uniform(0, 1, n))[:, None]
+            return positions, d if self.dir_out else ParticleEffect2D._random_directions_(n, rng)
 
         # Получить направление частицы:
-        def get_direction(self, orig_pos: vec2, spawn_pos: vec2) -> vec2:
+        def get_direction(self, orig_pos: vec2, spawn_pos: vec2, rng: numpy.random.Generator = None) -> vec2:
             if self.dir_out: return normalize(spawn_pos.xy-orig_pos.xy)
             else:
-                a = random.uniform(0, 2*math.pi)
+                a = (random if rng is None else rng).uniform(0, 2*math.pi)
                 return vec2(sin(a), cos(a))
 
     # Создать частицу в прямоугольнике:
@@ -82,21 +113,31 @@ class ParticleEffect2D:
             self.angle   = angle
             self.dir_out = dir_out
 
-        # Получить позицию частицы:
-        def get_position(self) -> vec2:
-            x = random.uniform(-self.size.x/2, +self.size.x/2)
-            y = random.uniform(-self.size.y/2, +self.size.y/2)
+        # Получить позицию частицы (rng - генератор случайных чисел, по умолчанию модуль random):
+        def get_position(self, rng: numpy.random.Generator = None) -> vec2:
+            rng = random if rng is None else rng
+            x = rng.uniform(-self.size.x/2, +self.size.x/2)
+            y = rng.uniform(-self.size.y/2, +self.size.y/2)
             if self.angle == 0.0: return vec2(x, y)  # Если угол равен нулю, возвращаем обычные координаты.
 
             ca, sa = math.cos(-self.angle), math.sin(-self.angle)
             rx, ry = x*ca - y*sa, x*sa + y*ca  # Вращаем координату.
             return vec2(rx, ry)
 
+        # Получить позиции и направления n частиц (направление наружу это направление от центра прямоугольника):
+        def sample(self, n: int, rng: numpy.random.Generator) -> tuple[numpy.ndarray, numpy.ndarray]:
+            positions = rng.uniform((-self.size.x/2, -self.size.y/2), (+self.size.x/2, +self.size.y/2), (n, 2))
+            if self.angle != 0.0:
+                ca, sa = math.cos(-self.angle), math.sin(-self.angle)
+                positions = positions @ numpy.array([[ca, sa], [-sa, ca]])  # Вращаем координаты.
+            if self.dir_out: return positions, ParticleEffect2D._directions_out_(positions)
+            return positions, ParticleEffect2D._random_directions_(n, rng)
+
         # Получить направление частицы:
-        def get_direction(self, orig_pos: vec2, spawn_pos: vec2) -> vec2:
+        def get_direction(self, orig_pos: vec2, spawn_pos: vec2, rng: numpy.random.Generator = None) -> vec2:
             if self.dir_out: return normalize(spawn_pos.xy-orig_pos.xy)
             else:
-                a = random.uniform(0, 2*math.pi)
+                a = (random if rng is None else rng).uniform(0, 2*math.pi)
                 return vec2(sin(a), cos(a))
 
     # Создать частицу в линии:
@@ -105,17 +146,23 @@ class ParticleEffect2D:
             self.point1 = point1
             self.point2 = point2
 
-        # Получить позицию частицы:
-        def get_position(self) -> vec2:
-            r = random.uniform(0, 1)  # Значение от 0.0 до 1.0 для интерполяции.
+        # Получить позицию частицы (rng - генератор случайных чисел, по умолчанию модуль random):
+        def get_position(self, rng: numpy.random.Generator = None) -> vec2:
+            r = (random if rng is None else rng).uniform(0, 1)  # Значение от 0.0 до 1.0 для интерполяции.
             return vec2(
                 self.point1.x+r*(self.point2.x-self.point1.x),
                 self.point1.y+r*(self.point2.y-self.point1.y)
             )
 
+        # Получить позиции и направления n частиц:
+        def sample(self, n: int, rng: numpy.random.Generator) -> tuple[numpy.ndarray, numpy.ndarray]:
+            r = rng.uniform(0, 1, n)[:, None]  # Значения от 0.0 до 1.0 для интерполяции.
+            p1, p2 = numpy.array(self.point1.xy), numpy.array(self.point2.xy)
+            return p1 + r * (p2 - p1), ParticleEffect2D._random_directions_(n, rng)
+
         # Получить направление частицы:
-        def get_direction(self, orig_pos: vec2, spawn_pos: vec2) -> vec2:
-            a = random.uniform(0, 2*math.pi)
+        def get_direction(self, orig_pos: vec2, spawn_pos: vec2, rng: numpy.random.Generator = None) -> vec2:
+            a = (random if rng is None else rng).uniform(0, 2*math.pi)
             return vec2(sin(a), cos(a))
 
     # Частица:
@@ -130,6 +177,19 @@ class ParticleEffect2D:
                      end_size:  vec2,
                      time:      float
                      ) -> None:
+            self.reset(texture, position, velocity, angle, end_angle, size, end_size, time)
+
+        # Заново задать параметры частицы (так объект частицы переиспользуется вместо создания нового):
+        def reset(self,
+                  texture:   Texture | list,
+                  position:  vec2,
+                  velocity:  vec2,
+                  angle:     float,
+                  end_angle: float,
+                  size:      vec2,
+                  end_size:  vec2,
+                  time:      float
+                  ) -> "ParticleEffect2D.Particle":
             self.texture    = texture
             self.position   = position
             self.velocity   = velocity
@@ -141,11 +201,91 @@ class ParticleEffect2D:
             self.e_size     = end_size.xy
             self.time       = time
             self.start_time = time
+            return self
 
         # Скорость перемещения частицы:
         @property
         def speed(self) -> float: return Utils2D.get_speed_vector(self.velocity)
 
+    # Частицы в виде массивов NumPy (структура массивов, используется при is_soa=True):
+    class ParticleArrays:
+        """ Каждое поле частиц хранится в своём непрерывном массиве, а живые частицы занимают первые count
+            элементов (например живые позиции это position[:count]). Поля совпадают с полями Particle,
+            кроме texture, где хранится номер текстуры в списке текстур эффекта.
+
+            Массивы выделяются один раз на всю вместимость (количество частиц эффекта) и растут только если
+            её превысить. Удалённые частицы заменяются последними живыми (swap-remove), а новые частицы
+            занимают освободившиеся места в конце, поэтому постоянное создание частиц не выделяет память.
+        """
+
+        # Поля частиц (имя, количество чисел на частицу, тип):
+        _FIELDS_ = (
+            ("texture",    1, numpy.int32),
+            ("position",   2, numpy.float64),
+            ("velocity",   2, numpy.float64),
+            ("angle",      1, numpy.float64),
+            ("s_angle",    1, numpy.float64),
+            ("e_angle",    1, numpy.float64),
+            ("size",       2, numpy.float64),
+            ("s_size",     2, numpy.float64),
+            ("e_size",     2, numpy.float64),
+            ("time",       1, numpy.float64),
+            ("start_time", 1, numpy.float64),
+        )
+
+        def __init__(self, capacity: int = 64) -> None:
+            self.count    = 0  # Количество живых частиц.
+            self.capacity = 0  # На сколько частиц выделены массивы.
+            self._resize_(int(max(capacity, 1)))
+
+        # Количество живых частиц:
+        def __len__(self) -> int:
+            return self.count
+
+        # Пересоздать массивы под новую вместимость (живые частицы копируются):
+        def _resize_(self, capacity: int) -> None:
+            for name, width, dtype in ParticleEffect2D.ParticleArrays._FIELDS_:
+                array = numpy.zeros((capacity, width) if width > 1 else capacity, dtype=dtype)
+                if self.capacity > 0: array[:self.count] = getattr(self, name)[:self.count]
+                setattr(self, name, array)
+            self.capacity = capacity
+
+            # Временные массивы для вычислений при обновлении частиц:
+            self.scratch  = numpy.empty((2, capacity), dtype=numpy.float64)
+            self.scratch2 = numpy.empty((capacity, 2), dtype=numpy.float64)
+            self.mask     = numpy.empty(capacity, dtype=numpy.bool_)
+
+        # Выделить место под n новых частиц в конце (возвращает срез новых частиц):
+        def add(self, n: int) -> slice:
+            if self.count + n > self.capacity: self._resize_(int(max(self.count + n, self.capacity * 2)))
+            new = slice(self.count, self.count + n)
+            self.count += n
+            return new
+
+        # Удалить частицы, отмеченные в маске (маска длиной count). Возвращает количество удалённых частиц:
+        def remove(self, mask: numpy.ndarray) -> int:
+            dead = numpy.flatnonzero(mask)
+            if len(dead) == 0: return 0
+            alive = self.count - len(dead)
+
+            # Дыры среди первых alive мест заполняем живыми частицами из хвоста (перемещается не больше len(dead)):
+            holes  = dead[:numpy.searchsorted(dead, alive)]
+            movers = numpy.flatnonzero(~mask[alive:]) + alive
+            if len(holes) > 0:
+                for name, _, _ in ParticleEffect2D.ParticleArrays._FIELDS_:
+                    array = getattr(self, name)
+                    array[holes] = array[movers]
+            self.count = alive
+            return len(dead)
+
+        # Урезать количество частиц:
+        def truncate(self, count: int) -> None:
+            self.count = int(clamp(count, 0, self.count))
+
+        # Удалить все частицы:
+        def clear(self) -> None:
+            self.count = 0
+
     # Инициализация:
     def __init__(self,
                  texture:       Texture | list,
@@ -166,8 +306,26 @@ class ParticleEffect2D:
                  is_local_pos:  bool  = False,
                  is_dir_angle:  bool  = True,
                  spawn_in:      SpawnInPoint | SpawnInCircle | SpawnInSquare | SpawnInLine = None,
-                 custom_update: any = None
+                 custom_update: any = None,
+                 is_soa:        bool  = False,
+                 seed:          int   = None,
+                 animate_frames: bool = False
                  ) -> None:
+        """ is_soa - Хранить частицы не объектами Particle, а в массивах NumPy (ParticleArrays). Обновление
+                     и удаление частиц тогда идёт сразу для всех частиц, а в custom_update передаётся
+                     ParticleArrays вместо списка частиц. Постоянное создание частиц без выделения памяти есть
+                     только в этом режиме. В режиме объектов удалённые частицы переиспользуются из пула,
+                     но при обновлении каждой частицы всё равно создаются временные векторы и числа.
+            seed   - Зерно генератора случайных чисел эффекта. С одним и тем же зерном эффект создаёт частицы
+                     одинаково в обоих режимах хранения, в том числе бесконечный (для тестов и повторов).
+
+            Если texture это кадры атласа (AtlasTexture из PackerTexture, одна или список), частица хранит номер
+            кадра, и все частицы рисуются через AtlasTextureBatch2D: по одному вызову на атлас, в том числе
+            вместе с другими эффектами того же атласа, если передать им общий пакет в render().
+            animate_frames - Менять кадр частицы по прогрессу её жизни (от первого кадра до последнего)
+                             вместо случайного кадра на всю жизнь.
+        """
+
         # Подготовка данных:
 
         # Подготовка начальных и конечных размеров частиц:
@@ -206,6 +364,20 @@ class ParticleEffect2D:
         self.is_dir_angle  = is_dir_angle   # Поворачивать ли частицу в сторону направления движения.
         self.spawn_in      = spawn_in       # Как создавать частицу (укажите класс спавнера частиц).
         self.custom_update = custom_update  # Кастомный обновлятор частиц.
+        self.is_soa        = is_soa         # Хранить частицы в массивах NumPy.
+        self.animate_frames = animate_frames  # Анимировать кадры атласа по прогрессу жизни частицы.
+
+        # Столкновения частиц (см. set_collision):
+        self.collision          = None      # Сетка столкновений или None.
+        self.collision_response = "bounce"  # Что делать при столкновении: "bounce", "kill" или "stick".
+        self.restitution        = 0.5       # Упругость отскока (доля скорости вдоль нормали).
+        self.collision_friction = 0.0       # Потеря скорости вдоль поверхности при отскоке (от 0 до 1).
+
+        # Ограничения создания частиц (обычно их задаёт ParticleSystemManager):
+        self.lod         = 1.0   # Уровень детализации от 0 до 1: доля от count и размер частиц в 1/sqrt(lod) раз.
+        self.spawn_limit = None  # Сколько ещё частиц можно создать (None - без ограничений).
+        self.spawned     = 0     # Сколько частиц создано (сбрасывает тот, кто ведёт учёт).
+        self.manager     = None  # Менеджер частиц, в котором зарегистрирован эффект (ограничивает общее количество).
 
         # Если передали пустой спавнер, создаём спавнер по умолчанию (точка):
         if self.spawn_in is None: self.spawn_in = ParticleEffect2D.SpawnInPoint()
@@ -214,56 +386,334 @@ class ParticleEffect2D:
         self.particles = None  # Список частиц.
         self._partvars_ = {
             "batch":   SpriteBatch2D(),
+            "atlas-batch": None,  # Пакет для кадров атласа. Создаётся при первой отрисовке.
             "old-pos": position.xy,
             "timer":   0.0,
             "old-dt":  1/60,
+            "rng":     numpy.random.default_rng(seed),
+            "free":    [],  # Пул удалённых объектов частиц для повторного использования.
+            "scratch": None,  # Временные массивы для сэмплирования новых частиц. Создаются при первом создании.
         }
 
-    # Создать одну частицу. Используется строго внутри этого класса:
-    def _create_particle_(self) -> None:
-        spwn_pos = self.spawn_in.get_position()
-        spwn_dir = self.spawn_in.get_direction(self.position, spwn_pos)
+    # Максимальное количество частиц с учётом уровня детализации:
+    def _get_max_count_(self) -> int:
+        return self.count if self.lod >= 1.0 else int(self.count * max(self.lod, 0.0))
 
-        ptxt = self.texture if type(self.texture) is Texture else random.choice(self.texture)
-        ppos = self.position.xy + spwn_pos.xy
-        pvel = normalize(spwn_dir+self.direction) * random.uniform(*self.speed.xy)
+    # Сколько частиц из n можно создать сейчас (учитывает детализацию, ограничение создания и общий предел
+    # частиц менеджера). alive - сколько частиц эффекта живо сейчас, если это не len(self.particles):
+    def _allow_spawns_(self, n: int, alive: int = None) -> int:
+        alive = len(self.particles) if alive is None else alive
+        n = int(min(n, self._get_max_count_() - alive))
+        if self.spawn_limit is not None: n = int(min(n, self.spawn_limit))
+        if self.manager is not None:     n = int(min(n, self.manager._get_room_() + len(self.particles) - alive))
+        if n <= 0: return 0
+        if self.spawn_limit is not None: self.spawn_limit -= n
+        if self.manager is not None:     self.manager._use_room_(n)
+        self.spawned += n
+        return n
 
-        pang = random.uniform(*self.start_angle.xy)
-        peag = random.uniform(*self.end_angle.xy)
+    # Во сколько раз увеличить размер частиц при пониженной детализации (меньше частиц, но крупнее):
+    def _get_lod_size_scale_(self) -> float:
+        return 1.0 if self.lod >= 1.0 or self.lod <= 0.0 else 1.0 / sqrt(self.lod)
 
-        psiz = vec2(
-            random.uniform(self.start_size[0].x, self.start_size[1].x),
-            random.uniform(self.start_size[0].y, self.start_size[1].y)
-        )
-        pnsz = vec2(
-            random.uniform(self.end_size[0].x, self.end_size[1].x),
-            random.uniform(self.end_size[0].y, self.end_size[1].y)
-        )
+    # Создать n объектов частиц (частицы сэмплируются в массивы генератором эффекта, а затем превращаются
+    # в объекты Particle). Используется строго внутри этого класса:
+    def _create_particle_objects_(self, n: int) -> None:
+        n = self._allow_spawns_(n)
+        if n <= 0: return
+        arrays = self._get_scratch_arrays_()
+        self._create_particles_(n, arrays)
+        self._arrays_to_particles_(arrays)
 
-        ptfl = random.uniform(*self.duration.xy)
-
-        # Частица:
-        particle = ParticleEffect2D.Particle(
-            ptxt,  # Текстура частицы.
-            ppos,  # Позиция.
-            pvel,  # Вектор направления и скорости.
-            pang,  # Угол поворота.
-            peag,  # Конечный угол поворота.
-            psiz,  # Размер.
-            pnsz,  # Конечный размер.
-            ptfl   # Время жизни частицы.
-        )
+    # Получить пустые временные массивы частиц эффекта (для сэмплирования новых частиц):
+    def _get_scratch_arrays_(self) -> "ParticleEffect2D.ParticleArrays":
+        if self._partvars_["scratch"] is None: self._partvars_["scratch"] = ParticleEffect2D.ParticleArrays(self.count)
+        self._partvars_["scratch"].clear()
+        return self._partvars_["scratch"]
+
+    # Получить список текстур эффекта:
+    def _get_textures_(self) -> list:
+        return list(self.texture) if isinstance(self.texture, (list, tuple)) else [self.texture]
+
+    # Являются ли текстуры эффекта кадрами атласа:
+    def _is_atlas_(self) -> bool:
+        for texture in self._get_textures_():
+            if not isinstance(texture, AtlasTexture): return False
+        return True
+
+    # Получить внутренний пакет отрисовки эффекта:
+    def _get_batch_(self) -> SpriteBatch2D | AtlasTextureBatch2D:
+        if not self._is_atlas_(): return self._partvars_["batch"]
+        if self._partvars_["atlas-batch"] is None: self._partvars_["atlas-batch"] = AtlasTextureBatch2D()
+        return self._partvars_["atlas-batch"]
+
+    # Задать зерно генератора случайных чисел эффекта (например чтобы повторить эффект):
+    def set_seed(self, seed: int = None) -> "ParticleEffect2D":
+        self._partvars_["rng"] = numpy.random.default_rng(seed)
+        return self
+
+    # Создать n частиц в массивах (по умолчанию в массивах частиц эффекта). Используется строго внутри этого класса:
+    def _create_particles_(self, n: int, arrays: "ParticleEffect2D.ParticleArrays" = None) -> None:
+        if n <= 0: return
+        rng = self._partvars_["rng"]
 
-        # Добавляем частицу к другим частицам:
-        self.particles.append(particle)
+        # Позиции и направления от спавнера:
+        if hasattr(self.spawn_in, "sample"): spwn_pos, spwn_dir = self.spawn_in.sample(n, rng)
+        else:
+            spwn_pos, spwn_dir = numpy.empty((n, 2)), numpy.empty((n, 2))
+            for i in range(n):
+                pos = self.spawn_in.get_position()
+                spwn_pos[i] = pos.x, pos.y
+                spwn_dir[i] = self.spawn_in.get_direction(self.position, pos).xy
+
+        # Нормализуем направления (нулевые оставляем нулевыми):
+        spwn_dir = ParticleEffect2D._directions_out_(spwn_dir + (self.direction.x, self.direction.y))
+
+        arrays = self.particles if arrays is None else arrays
+        new    = arrays.add(n)
+        arrays.texture[new]    = rng.integers(0, len(self._get_textures_()), n)
+        arrays.position[new]   = spwn_pos + (self.position.x, self.position.y)
+        arrays.velocity[new]   = spwn_dir * rng.uniform(self.speed.x, self.speed.y, n)[:, None]
+        arrays.angle[new]      = arrays.s_angle[new] = rng.uniform(self.start_angle.x, self.start_angle.y, n)
+        arrays.e_angle[new]    = rng.uniform(self.end_angle.x, self.end_angle.y, n)
+        arrays.size[new]       = arrays.s_size[new] = rng.uniform(
+            tuple(self.start_size[0].xy), tuple(self.start_size[1].xy), (n, 2))
+        arrays.e_size[new]     = rng.uniform(tuple(self.end_size[0].xy), tuple(self.end_size[1].xy), (n, 2))
+        arrays.time[new]       = arrays.start_time[new] = rng.uniform(self.duration.x, self.duration.y, n)
+
+        # При пониженной детализации частицы крупнее:
+        if self.lod < 1.0:
+            arrays.s_size[new] *= self._get_lod_size_scale_()
+            arrays.e_size[new] *= self._get_lod_size_scale_()
+            arrays.size[new]    = arrays.s_size[new]
+
+    # Плавная интерполяция от 0 до 1 для массивов (как smoothstep(0, 1, x), на месте в x, tmp - временный массив):
+    @staticmethod
+    def _smoothstep_(x: numpy.ndarray, tmp: numpy.ndarray) -> numpy.ndarray:
+        numpy.clip(x, 0.0, 1.0, out=x)
+        numpy.multiply(x, -2.0, out=tmp)
+        tmp += 3.0
+        x *= x
+        x *= tmp
+        return x
 
     # Создать эффект частиц:
     def create(self) -> "ParticleEffect2D":
+        if self.is_soa:
+            if self.particles is None: self.particles = ParticleEffect2D.ParticleArrays(self.count)
+            if not self.is_infinite: self._create_particles_(self._allow_spawns_(self.count - len(self.particles)))
+            return self
+
         if self.particles is None: self.particles = []
+        if self.is_infinite: return self
+
+        # Сэмплируем все частицы сразу во временные массивы и собираем из них объекты частиц:
+        self._create_particle_objects_(self.count - len(self.particles))
+
+        return self
+
+    # Добавить частицы из массивов в список объектов частиц (удалённые объекты частиц берутся из пула):
+    def _arrays_to_particles_(self, arrays: "ParticleEffect2D.ParticleArrays") -> None:
+        textures, free = self._get_textures_(), self._partvars_["free"]
+        for k in range(arrays.count):
+            particle = free.pop().reset if free else ParticleEffect2D.Particle
+            particle = particle(
+                textures[arrays.texture[k]],
+                vec2(*arrays.position[k]),
+                vec2(*arrays.velocity[k]),
+                float(arrays.s_angle[k]),
+                float(arrays.e_angle[k]),
+                vec2(*arrays.s_size[k]),
+                vec2(*arrays.e_size[k]),
+                float(arrays.start_time[k])
+            )
+            particle.angle, particle.size.xy, particle.time = float(arrays.angle[k]), vec2(*arrays.size[k]), float(arrays.time[k])
+            self.particles.append(particle)
+
+    # Собрать массивы из списка объектов частиц:
+    def _particles_to_arrays_(self) -> "ParticleEffect2D.ParticleArrays":
+        textures = self._get_textures_()
+        arrays = ParticleEffect2D.ParticleArrays(len(self.particles))
+        new = arrays.add(len(self.particles))
+        for k, particle in zip(range(new.start, new.stop), self.particles):
+            arrays.texture[k]    = textures.index(particle.texture) if particle.texture in textures else 0
+            arrays.position[k]   = particle.position.xy
+            arrays.velocity[k]   = particle.velocity.xy
+            arrays.angle[k]      = particle.angle
+            arrays.s_angle[k]    = particle.s_angle
+            arrays.e_angle[k]    = particle.e_angle
+            arrays.size[k]       = particle.size.xy
+            arrays.s_size[k]     = particle.s_size.xy
+            arrays.e_size[k]     = particle.e_size.xy
+            arrays.time[k]       = particle.time
+            arrays.start_time[k] = particle.start_time
+        return arrays
+
+    # Прокрутить частицы в массивах вперёд на ages секунд (у каждой частицы своё время) без пошагового обновления:
+    def _advance_arrays_(self, arrays: "ParticleEffect2D.ParticleArrays", ages: numpy.ndarray) -> None:
+        """ Скорость и позиция считаются по формуле суммы шагов update() с шагом dt прошлого кадра:
+            v(k) = r^k * v0 + c * (1 - r^k) / (1 - r),  где r = 1 - damping, c = gravity * dt * r,
+            а позиция сдвигается на dt * (v(1) + ... + v(k)). Дробное количество шагов k = age / dt допускается.
+        """
+
+        n = arrays.count
+        dt = min(self._partvars_["old-dt"], 1/10)
+        steps = ages / dt
+        r = 1.0 - self.damping
+        c = numpy.array((self.gravity.x, self.gravity.y)) * dt * r
+        v0 = arrays.velocity[:n].copy()
+
+        if r == 1.0:
+            vel_sum = v0 * steps[:, None] + c * (steps * (steps + 1) / 2)[:, None]
+            arrays.velocity[:n] = v0 + c * steps[:, None]
+        else:
+            rk = (r ** steps)[:, None]
+            geom = (1.0 - rk) / (1.0 - r)  # 1 + r + ... + r^(k-1).
+            vel_sum = v0 * r * geom + c / (1.0 - r) * (steps[:, None] - r * geom)
+            arrays.velocity[:n] = rk * v0 + c * geom
+        arrays.position[:n] += vel_sum * dt
+
+        # Время жизни, поворот и размер по прогрессу жизни:
+        arrays.time[:n] -= ages
+        tmp = numpy.empty(n)
+        for field, exp in (("angle", self.angle_exp), ("size", self.size_exp)):
+            t = self._smoothstep_((1.0 - arrays.time[:n] / arrays.start_time[:n]) ** exp, tmp)
+            start, end = getattr(arrays, "s_" + field)[:n], getattr(arrays, "e_" + field)[:n]
+            getattr(arrays, field)[:n] = start + (end - start) * (t if start.ndim == 1 else t[:, None])
+
+    # Прокрутить эффект вперёд на seconds секунд за один проход (например прогреть огонь или дым при загрузке):
+    def prewarm(self, seconds: float) -> "ParticleEffect2D":
+        """ Конечные эффекты просто стареют на seconds (умершие частицы удаляются). Бесконечные эффекты
+            создаются заново: каждое место частицы появляется по очереди с интервалом создания и после смерти
+            частицы сразу занимается новой (как в update()), а в конце все частицы прокручиваются на свой возраст.
+        """
+
+        if self.particles is None: self.create()
+        if seconds <= 0.0 or self.custom_update is not None: return self
+        arrays = self.particles if self.is_soa else self._particles_to_arrays_()
+
+        if not self.is_infinite:
+            self._advance_arrays_(arrays, numpy.full(arrays.count, float(seconds)))
+        else:
+            # Места частиц появляются по очереди, пока не наберётся максимальное количество:
+            max_count = self._get_max_count_()
+            if max_count <= 0: return self
+            if not self.is_soa:
+                self._partvars_["free"].extend(self.particles)
+                self.particles.clear()
+            interval = (sum(self.duration) / 2) / max_count
+            born = int(min(max_count, int(seconds // interval) + 1))
+            arrays.clear()
+            self._create_particles_(self._allow_spawns_(born), arrays)
+            n = arrays.count
+            ages = seconds - numpy.arange(n) * interval
+
+            # Давно появившимся местам оставляем пару полных жизней, этого достаточно для установившегося возраста:
+            longest = max(self.duration.x, self.duration.y)
+            old = ages > 3 * longest
+            ages[old] = 2 * longest + numpy.mod(ages[old], longest)
 
-        for i in range(0 if self.is_infinite else self.count-len(self.particles)):
-            self._create_particle_()
+            # Умершие частицы заменяются новыми (возраст уменьшается на прожитое время). Если создавать больше
+            # нельзя, места остаются пустыми и удаляются в конце:
+            for i in range(64):
+                dead = numpy.flatnonzero(ages >= arrays.time[:n])
+                if len(dead) == 0: break
+                refill = self._allow_spawns_(len(dead), n - len(dead))
+                if refill == 0: break
+                dead = dead[:refill]
+                ages[dead] -= arrays.time[dead]
+                fresh = self._get_scratch_arrays_()
+                self._create_particles_(refill, fresh)
+                for name, _, _ in ParticleEffect2D.ParticleArrays._FIELDS_:
+                    getattr(arrays, name)[dead] = getattr(fresh, name)[:refill]
+            else:
+                dead = ages >= arrays.time[:n]
+                ages[dead] = self._partvars_["rng"].uniform(0.0, 1.0, int(dead.sum())) * arrays.time[:n][dead]
+
+            self._advance_arrays_(arrays, ages)
+            self._partvars_["timer"] = born * interval - seconds if born < max_count else 0.0
+
+        # Удаляем умершие частицы:
+        arrays.remove(arrays.time[:arrays.count] <= 0.0)
+        if not self.is_soa:
+            self._partvars_["free"].extend(self.particles)
+            self.particles.clear()
+            self._arrays_to_particles_(arrays)
+
+        return self
 
+    # Включить столкновения частиц с геометрией:
+    def set_collision(self,
+                      grid:        any,
+                      response:    str   = "bounce",
+                      restitution: float = 0.5,
+                      friction:    float = 0.0
+                      ) -> "ParticleEffect2D":
+        """ grid     - Сетка столкновений (Physics2D.Space.get_collision_grid()) или любой объект с методами
+                       query(points) и query_point(x, y), как у Physics2D.CollisionGrid. None выключает столкновения.
+            response - "bounce" (отскок), "kill" (частица умирает) или "stick" (частица прилипает).
+            Все живые частицы проверяются одним запросом к сетке за кадр.
+        """
+
+        if response not in ("bounce", "kill", "stick"):
+            raise ValueError(f"Unknown particle collision response: \"{response}\".")
+        self.collision          = grid
+        self.collision_response = response
+        self.restitution        = restitution
+        self.collision_friction = friction
+        return self
+
+    # Столкновение одной частицы (частица уже перемещена на свой шаг, но ещё не сдвинута вместе с эффектом):
+    def _collide_particle_(self, particle: "ParticleEffect2D.Particle", dt: float) -> None:
+        hit, nx, ny = self.collision.query_point(particle.position.x, particle.position.y)
+        if not hit: return
+        if self.collision_response == "kill": particle.time = 0.0 ; return
+
+        # Возвращаем частицу на прошлую позицию (вне геометрии). Шаг частицы-объекта равен направлению умноженному на
+        # её скорость, а не velocity * dt:
+        particle.position -= normalize(particle.velocity) * particle.speed * dt
+        if self.collision_response == "stick": particle.velocity = vec2(0.0) ; return
+
+        # Отражаем скорость от поверхности:
+        vn = particle.velocity.x * nx + particle.velocity.y * ny
+        if vn >= 0.0: return
+        tx, ty = particle.velocity.x - nx * vn, particle.velocity.y - ny * vn
+        particle.velocity = vec2(
+            tx * (1.0 - self.collision_friction) - nx * vn * self.restitution,
+            ty * (1.0 - self.collision_friction) - ny * vn * self.restitution
+        )
+
+    # Столкновения частиц в массивах (частицы уже перемещены на velocity * dt, но ещё не сдвинуты вместе с эффектом):
+    def _collide_arrays_(self, arrays: "ParticleEffect2D.ParticleArrays", dt: float) -> None:
+        n = arrays.count
+        hits, normals = self.collision.query(arrays.position[:n])
+        hit = numpy.flatnonzero(hits)
+        if len(hit) == 0: return
+        if self.collision_response == "kill": arrays.time[hit] = 0.0 ; return
+
+        # Возвращаем частицы на прошлые позиции (вне геометрии):
+        velocity = arrays.velocity[hit]
+        arrays.position[hit] -= velocity * dt
+        if self.collision_response == "stick": arrays.velocity[hit] = 0.0 ; return
+
+        # Отражаем скорости частиц, летящих в поверхность (скорость вдоль нормали меньше нуля):
+        normals = normals[hit]
+        vn = numpy.minimum(numpy.einsum("ij,ij->i", velocity, normals), 0.0)[:, None]
+        tangent = velocity - normals * vn
+        arrays.velocity[hit] = tangent * (1.0 - self.collision_friction) - normals * (vn * self.restitution)
+
+    # Сбросить эффект для повторного использования (частицы удаляются, массивы и объекты частиц остаются в пуле):
+    def reset(self, position: vec2 = None) -> "ParticleEffect2D":
+        if position is not None: self.position = vec2(position.xy)
+        if self.particles is not None:
+            if self.is_soa: self.particles.clear()
+            else:
+                self._partvars_["free"].extend(self.particles)
+                self.particles.clear()
+        self._partvars_["old-pos"] = self.position.xy
+        self._partvars_["timer"]   = 0.0
+        self._partvars_["old-dt"]  = 1/60
+        self.spawned = 0
         return self
 
     # Обновление частиц:
@@ -276,27 +726,43 @@ class ParticleEffect2D:
         dt = min(self._partvars_["old-dt"] if delta_time > self._partvars_["old-dt"] * 2 else delta_time, 1/10)
         self._partvars_["old-dt"] = delta_time
 
+        if self.is_soa: return self._update_arrays_(dt)
+
         # Если количество частиц меньше установленного, создаём новые:
-        if len(self.particles) < self.count and self.is_infinite:
+        max_count = self._get_max_count_()
+        if len(self.particles) < max_count and self.is_infinite:
             self._partvars_["timer"] -= dt
-            while self._partvars_["timer"] <= 0.0:
-                self._create_particle_()
-                self._partvars_["timer"] += (sum(self.duration) / 2) / self.count
+            if self._partvars_["timer"] <= 0.0:
+                interval = (sum(self.duration) / 2) / max_count
+                spawns = int(-self._partvars_["timer"] // interval) + 1
+                self._partvars_["timer"] += spawns * interval
+                self._create_particle_objects_(spawns)
 
         # Урезаем лишние частицы (на всякий случай ограничиваем их количество):
-        self.particles = self.particles[:self.count]
+        particles, free = self.particles, self._partvars_["free"]
+        if len(particles) > max_count:
+            free.extend(particles[max_count:])
+            del particles[max_count:]
+
+        # Гравитация и затухание за этот кадр (скорость частиц меняется на месте):
+        gravity, damping = self.gravity * dt, 1.0 - self.damping
+
+        # Проходимся по частицам. Удалённые частицы меняются местами с последней необработанной частицей
+        # и собираются в конце списка, поэтому удаление стоит O(1), а не O(n):
+        index, alive = 0, len(particles)
+        while index < alive:
+            particle = particles[index]
 
-        # Проходимся по частицам (проходимся по последней копии списка частиц):
-        for particle in list(self.particles):
             # Уменьшаем время жизни частицы:
             particle.time -= dt
 
             # Применяем гравитацию к направлению частицы:
-            particle.velocity += self.gravity * dt
-            particle.velocity *= 1.0 - self.damping
+            particle.velocity += gravity
+            particle.velocity *= damping
 
             # Перемещаем частичку в сторону её направления умноженное на её скорость:
             particle.position += normalize(particle.velocity) * particle.speed * dt
+            if self.collision is not None: self._collide_particle_(particle, dt)
             if self.is_local_pos: particle.position += self.position - self._partvars_["old-pos"]
 
             # Прогресс жизни частицы от 0 до 1:
@@ -312,37 +778,410 @@ class ParticleEffect2D:
 
             # Удаляем частицу только после всех изменений и если её время вышло:
             if particle.time <= 0.0:
-                self.particles.remove(particle)
-                if self.is_infinite: self._create_particle_()
+                alive -= 1
+                particles[index], particles[alive] = particles[alive], particle
+            else: index += 1
+
+        # Отдаём удалённые частицы в пул и создаём им замену (бесконечные частицы):
+        dead = len(particles) - alive
+        if dead > 0:
+            free.extend(particles[alive:])
+            del particles[alive:]
+            if self.is_infinite: self._create_particle_objects_(dead)
+
+        self._partvars_["old-pos"].xy = self.position.xy
+        return self
+
+    # Обновление частиц в массивах (всё то же самое что и в update, но сразу для всех частиц):
+    def _update_arrays_(self, dt: float) -> "ParticleEffect2D":
+        arrays = self.particles
+
+        # Если количество частиц меньше установленного, создаём столько, сколько прошло интервалов создания:
+        max_count = self._get_max_count_()
+        if len(arrays) < max_count and self.is_infinite:
+            self._partvars_["timer"] -= dt
+            if self._partvars_["timer"] <= 0.0:
+                interval = (sum(self.duration) / 2) / max_count
+                spawns = int(-self._partvars_["timer"] // interval) + 1
+                self._partvars_["timer"] += spawns * interval
+                self._create_particles_(self._allow_spawns_(spawns))
+
+        # Урезаем лишние частицы (на всякий случай ограничиваем их количество):
+        arrays.truncate(max_count)
+        n = arrays.count
+
+        # Все вычисления идут на месте или во временных массивах частиц, чтобы не выделять память каждый кадр:
+        prgss, value_t, scratch2 = arrays.scratch[0, :n], arrays.scratch[1, :n], arrays.scratch2[:n]
+
+        # Уменьшаем время жизни частиц:
+        time = arrays.time[:n]
+        time -= dt
+
+        # Применяем гравитацию и затухание к скорости частиц и перемещаем их:
+        velocity = arrays.velocity[:n]
+        velocity += (self.gravity.x * dt, self.gravity.y * dt)
+        velocity *= 1.0 - self.damping
+        position = arrays.position[:n]
+        position += numpy.multiply(velocity, dt, out=scratch2)
+        if self.collision is not None: self._collide_arrays_(arrays, dt)
+        if self.is_local_pos:
+            old_pos = self._partvars_["old-pos"]
+            position += (self.position.x - old_pos.x, self.position.y - old_pos.y)
+
+        # Прогресс жизни частиц от 0 до 1, поворот и размер:
+        numpy.divide(time, arrays.start_time[:n], out=prgss)
+        numpy.subtract(1.0, prgss, out=prgss)
+        for field, exp in (("angle", self.angle_exp), ("size", self.size_exp)):
+            self._smoothstep_(numpy.power(prgss, exp, out=value_t), scratch2[:, 0])
+            value = getattr(arrays, field)[:n]
+            start = getattr(arrays, "s_" + field)[:n]
+            numpy.subtract(getattr(arrays, "e_" + field)[:n], start, out=value)
+            value *= value_t if value.ndim == 1 else value_t[:, None]
+            value += start
+
+        # Удаляем частицы, время которых вышло (бесконечные частицы сразу заменяются новыми):
+        dead = arrays.remove(numpy.less_equal(time, 0.0, out=arrays.mask[:n]))
+        if dead > 0 and self.is_infinite: self._create_particles_(self._allow_spawns_(dead))
 
         self._partvars_["old-pos"].xy = self.position.xy
         return self
 
     # Отрисовка частиц:
-    def render(self, color: list = None, batch: SpriteBatch2D = None) -> "ParticleEffect2D":
+    def render(self, color: list = None, batch: SpriteBatch2D | AtlasTextureBatch2D = None) -> "ParticleEffect2D":
+        """ Для кадров атласа batch должен быть AtlasTextureBatch2D, иначе SpriteBatch2D. """
+
         if self.particles is None: return
+        if self.is_soa: return self._render_arrays_(color, batch)
+
+        # Кадры атласа для анимации по прогрессу жизни:
+        frames = self._get_textures_() if self.animate_frames and self._is_atlas_() else None
 
         # Проходимся по частицам:
-        if batch is None: self._partvars_["batch"].begin()
+        sprite_batch = self._get_batch_() if batch is None else batch
+        if batch is None: sprite_batch.begin()
         for particle in self.particles:
             angl = Utils2D.get_angle_points(vec2(0), normalize(particle.velocity)) + 90 if self.is_dir_angle else 0.0
 
+            # Текстура частицы (или кадр по прогрессу жизни):
+            texture = particle.texture
+            if frames is not None:
+                texture = frames[int(clamp((1.0 - particle.time / particle.start_time) * len(frames), 0, len(frames) - 1))]
+
             # Рисуем частицу:
-            sprite_batch = self._partvars_["batch"] if batch is None else batch
             sprite_batch.draw(
-                sprite = particle.texture,
-                x      = particle.position.x - particle.size.x / 2,
-                y      = particle.position.y - particle.size.y / 2,
-                width  = particle.size.x,
-                height = particle.size.y,
-                angle  = angl + particle.angle
+                texture,
+                particle.position.x - particle.size.x / 2,
+                particle.position.y - particle.size.y / 2,
+                particle.size.x,
+                particle.size.y,
+                angl + particle.angle
             )
         if batch is None:
-            self._partvars_["batch"].end()
-            self._partvars_["batch"].render(color)
+            sprite_batch.end()
+            sprite_batch.render(color)
+        return self
+
+    # Отрисовка частиц из массивов (вершины пишутся прямо из массивов частиц в буфер пакета, по одному
+    # вызову отрисовки на текстуру или на атлас):
+    def _render_arrays_(self, color: list = None, batch: SpriteBatch2D | AtlasTextureBatch2D = None) -> "ParticleEffect2D":
+        arrays   = self.particles
+        n        = arrays.count
+        textures = self._get_textures_()
+
+        # Поворот в сторону движения считается по скоростям, а номера текстур нужны только если текстур несколько:
+        velocities = arrays.velocity[:n] if self.is_dir_angle else None
+        texture_ids = arrays.texture[:n] if len(textures) > 1 else None
+
+        sprite_batch = self._get_batch_() if batch is None else batch
+        if batch is None: sprite_batch.begin()
+
+        # Кадры атласа рисуются все сразу (номер кадра это номер текстуры или кадр по прогрессу жизни):
+        if self._is_atlas_():
+            if self.animate_frames:
+                progress = 1.0 - arrays.time[:n] / arrays.start_time[:n]
+                texture_ids = numpy.clip(progress * len(textures), 0, len(textures) - 1).astype(numpy.int32)
+            sprite_batch.draw_particles(
+                textures, arrays.position[:n], arrays.size[:n], arrays.angle[:n], velocities, texture_ids)
+        else:
+            for index, texture in enumerate(textures):
+                sprite_batch.draw_particles(
+                    texture, arrays.position[:n], arrays.size[:n], arrays.angle[:n], velocities, texture_ids, index)
+
+        if batch is None:
+            sprite_batch.end()
+            sprite_batch.render(color)
         return self
 
     # Удалить систему частиц:
     def destroy(self) -> None:
         if self.texture is None: return
         self.texture.destroy()
+
+
+# Менеджер систем частиц (общий бюджет частиц на все эффекты):
+class ParticleSystemManager:
+    """ Пример использования:
+        manager = ParticleSystemManager(max_particles=20000, spawn_budget=2000, camera=camera)
+        manager.register(explosion, priority=2.0, name="explosion")
+        ...
+        manager.update(delta_time)
+        manager.render()
+
+        Каждый кадр менеджер:
+        1. Считает уровень детализации (lod) эффекта по расстоянию до камеры: до lod_near - 1.0, дальше плавно
+           падает до min_lod на lod_far. Далёкие эффекты держат меньше частиц, но крупнее.
+        2. Делит бюджет создания частиц на кадр между эффектами по весу (priority * lod).
+        3. Считает время обновления и отрисовки каждого эффекта (get_stats()).
+
+        Зарегистрированный эффект не создаёт частиц сверх свободного места до max_particles, в том числе вне
+        update() (например взрыв из create()), поэтому общее количество живых частиц не превышает max_particles.
+    """
+
+    # Зарегистрированный эффект:
+    class Emitter:
+        def __init__(self, effect: ParticleEffect2D, priority: float, name: str) -> None:
+            self.effect      = effect    # Эффект частиц.
+            self.priority    = priority  # Приоритет при делении бюджета (больше - важнее).
+            self.name        = name      # Имя в статистике.
+            self.weight      = 0.0       # Вес в текущем кадре (priority * lod).
+            self.update_time = 0.0       # Время последнего обновления (в секундах).
+            self.render_time = 0.0       # Время последней отрисовки (в секундах).
+            self.spawned     = 0         # Сколько частиц создано в последнем кадре.
+
+    def __init__(self,
+                 max_particles: int      = 20000,
+                 spawn_budget:  int      = 2000,
+                 camera:        Camera2D = None,
+                 lod_near:      float    = 1024.0,
+                 lod_far:       float    = 4096.0,
+                 min_lod:       float    = 0.25
+                 ) -> None:
+        self.max_particles = max_particles  # Сколько частиц может жить одновременно во всех эффектах.
+        self.spawn_budget  = spawn_budget   # Сколько частиц можно создать за кадр во всех эффектах.
+        self.camera        = camera         # Камера для детализации по расстоянию (None - без детализации).
+        self.lod_near      = lod_near       # До этого расстояния от камеры эффект рисуется полностью.
+        self.lod_far       = lod_far        # С этого расстояния детализация минимальная.
+        self.min_lod       = min_lod        # Минимальный уровень детализации.
+        self.emitters      = []             # Зарегистрированные эффекты.
+        self._room_        = None           # Свободное место до max_particles во время update() (иначе считается).
+
+    # Зарегистрировать эффект:
+    def register(self, effect: ParticleEffect2D, priority: float = 1.0, name: str = None) -> ParticleEffect2D:
+        name = f"effect-{len(self.emitters)}" if name is None else name
+        self.emitters.append(ParticleSystemManager.Emitter(effect, priority, name))
+        effect.manager = self
+        return effect
+
+    # Убрать эффект из менеджера (ограничения эффекта снимаются):
+    def unregister(self, effect: ParticleEffect2D) -> None:
+        for emitter in self.emitters:
+            if emitter.effect is effect:
+                self.emitters.remove(emitter)
+                effect.lod, effect.spawn_limit, effect.manager = 1.0, None, None
+                return
+
+    # Количество живых частиц во всех эффектах:
+    def get_particle_count(self) -> int:
+        return sum(len(emitter.effect.particles) for emitter in self.emitters if emitter.effect.particles is not None)
+
+    # Сколько ещё частиц можно создать до общего предела:
+    def _get_room_(self) -> int:
+        if self._room_ is not None: return self._room_
+        return int(max(self.max_particles - self.get_particle_count(), 0))
+
+    # Учесть созданные частицы (во время update() свободное место не пересчитывается по всем эффектам):
+    def _use_room_(self, n: int) -> None:
+        if self._room_ is not None: self._room_ -= n
+
+    # Уровень детализации эффекта по расстоянию до камеры:
+    def _get_lod_(self, effect: ParticleEffect2D) -> float:
+        if self.camera is None: return 1.0
+        distance = length(effect.position.xy - self.camera.position.xy)
+        if distance <= self.lod_near: return 1.0
+        if distance >= self.lod_far:  return self.min_lod
+        return 1.0 - (1.0 - self.min_lod) * (distance - self.lod_near) / (self.lod_far - self.lod_near)
+
+    # Обновить все эффекты:
+    def update(self, delta_time: float) -> "ParticleSystemManager":
+        # Бюджет создания частиц на кадр не больше свободного места до общего предела:
+        self._room_ = int(max(self.max_particles - self.get_particle_count(), 0))
+        budget = min(self.spawn_budget, self._room_)
+
+        # Детализация и вес каждого эффекта:
+        for emitter in self.emitters:
+            emitter.effect.lod = self._get_lod_(emitter.effect)
+            emitter.weight     = max(emitter.priority, 0.0) * emitter.effect.lod
+
+        # Делим бюджет по весу. Остаток от округления отдаём самым важным эффектам:
+        total_weight = sum(emitter.weight for emitter in self.emitters)
+        ordered = sorted(self.emitters, key=lambda e: e.weight, reverse=True)
+        remaining = budget
+        for emitter in ordered:
+            share = int(budget * emitter.weight / total_weight) if total_weight > 0.0 else 0
+            emitter.effect.spawn_limit = share
+            remaining -= share
+        for emitter in ordered:
+            if remaining <= 0: break
+            if emitter.weight > 0.0: emitter.effect.spawn_limit += 1 ; remaining -= 1
+
+        # Обновляем эффекты и считаем их стоимость:
+        try:
+            for emitter in self.emitters:
+                emitter.effect.spawned = 0
+                start = time.perf_counter()
+                emitter.effect.update(delta_time)
+                emitter.update_time = time.perf_counter() - start
+                emitter.spawned     = emitter.effect.spawned
+        finally:
+            # Доли бюджета действуют только в этом кадре, а общий предел вне update() проверяется через _get_room_():
+            self._room_ = None
+            for emitter in self.emitters: emitter.effect.spawn_limit = None
+
+        return self
+
+    # Отрисовать все эффекты:
+    def render(self,
+               color:       list                = None,
+               batch:       SpriteBatch2D       = None,
+               atlas_batch: AtlasTextureBatch2D = None
+               ) -> "ParticleSystemManager":
+        """ batch       - Общий пакет для эффектов с обычными текстурами.
+            atlas_batch - Общий пакет для эффектов с кадрами атласа.
+            Эффект, для которого пакет не передан, рисуется своим внутренним пакетом.
+        """
+
+        for emitter in self.emitters:
+            start = time.perf_counter()
+            emitter.effect.render(color, atlas_batch if emitter.effect._is_atlas_() else batch)
+            emitter.render_time = time.perf_counter() - start
+        return self
+
+    # Получить стоимость каждого эффекта за последний кадр:
+    def get_stats(self) -> dict:
+        return {
+            emitter.name: {
+                "particles": 0 if emitter.effect.particles is None else len(emitter.effect.particles),
+                "spawned":   emitter.spawned,
+                "lod":       emitter.effect.lod,
+                "update-ms": emitter.update_time * 1000.0,
+                "render-ms": emitter.render_time * 1000.0,
+            } for emitter in self.emitters
+        }
+
+
+# Пул эффектов частиц по заготовкам (для коротких эффектов вроде искр и взрывов):
+class ParticleEffectPool:
+    """ Пример использования:
+        pool = ParticleEffectPool()
+        pool.add_preset("sparks", texture=spark_texture, direction=vec2(0), start_size=vec2(4), end_size=vec2(0),
+                        speed=vec2(50, 120), damping=0.02, duration=vec2(0.2, 0.5), count=64, gravity=vec2(0),
+                        is_soa=True)
+        ...
+        pool.spawn("sparks", vec2(x, y))
+        pool.update(delta_time)
+        pool.render()
+
+        Экземпляры эффектов не удаляются, а возвращаются в пул своей заготовки и переиспользуются вместе со своими
+        массивами и объектами частиц. Конечный эффект (is_infinite=False) возвращается в пул сам, когда все его
+        частицы умерли. Бесконечные эффекты нужно вернуть в пул вручную через release().
+
+        С менеджером эффект регистрируется до создания частиц, поэтому его частицы тоже ограничены max_particles.
+    """
+
+    def __init__(self, manager: ParticleSystemManager = None, batch: SpriteBatch2D = None) -> None:
+        self.manager  = manager  # Менеджер частиц, в котором регистрируются активные эффекты (или None).
+        self.batch    = SpriteBatch2D() if batch is None else batch  # Общий пакет отрисовки всех эффектов.
+        self.atlas_batch = AtlasTextureBatch2D()  # Общий пакет эффектов с кадрами атласа.
+        self.presets  = {}  # Заготовки эффектов (имя: параметры ParticleEffect2D).
+        self.active   = []  # Активные эффекты.
+        self._free_   = {}  # Свободные экземпляры (имя заготовки: список эффектов).
+        self._names_  = {}  # Имя заготовки каждого экземпляра (id эффекта: имя).
+
+    # Добавить заготовку эффекта (параметры как у ParticleEffect2D, кроме position):
+    def add_preset(self, name: str, priority: float = 1.0, **params) -> "ParticleEffectPool":
+        params.setdefault("is_infinite", False)
+        self.presets[name] = (params, priority)
+        self._free_.setdefault(name, [])
+        return self
+
+    # Создать заранее count экземпляров заготовки (чтобы не создавать их во время игры):
+    def reserve(self, name: str, count: int) -> "ParticleEffectPool":
+        params, _ = self.presets[name]
+        free = self._free_[name]
+        while len(free) < count:
+            effect = ParticleEffect2D(position=vec2(0.0), **params)
+            self._names_[id(effect)] = name
+            free.append(effect)
+        return self
+
+    # Запустить эффект заготовки в позиции:
+    def spawn(self, name: str, position: vec2, direction: vec2 = None) -> ParticleEffect2D:
+        if name not in self.presets: raise ValueError(f"Unknown particle effect preset: \"{name}\".")
+        params, priority = self.presets[name]
+
+        # Берём свободный экземпляр или создаём новый, если свободных нет:
+        free = self._free_[name]
+        if free: effect = free.pop()
+        else:
+            effect = ParticleEffect2D(position=vec2(0.0), **params)
+            self._names_[id(effect)] = name
+
+        effect.reset(position)
+        if direction is not None: effect.direction = vec2(direction.xy)
+        self.active.append(effect)
+
+        # Регистрируем эффект до создания частиц, чтобы менеджер ограничил и их:
+        if self.manager is not None: self.manager.register(effect, priority, name)
+        effect.create()
+        return effect
+
+    # Вернуть эффект в пул:
+    def release(self, effect: ParticleEffect2D) -> None:
+        if effect not in self.active: return
+        self.active.remove(effect)
+        self._release_(effect)
+
+    # Вернуть эффект в пул его заготовки (эффект уже убран из активных):
+    def _release_(self, effect: ParticleEffect2D) -> None:
+        if self.manager is not None: self.manager.unregister(effect)
+        effect.reset()
+        self._free_[self._names_[id(effect)]].append(effect)
+
+    # Количество активных эффектов:
+    def get_active_count(self) -> int:
+        return len(self.active)
+
+    # Обновить активные эффекты (если эффекты в менеджере, их обновляет менеджер):
+    def update(self, delta_time: float) -> "ParticleEffectPool":
+        active = self.active
+        index = 0
+        while index < len(active):
+            effect = active[index]
+            if self.manager is None: effect.update(delta_time)
+
+            # Закончившийся конечный эффект возвращаем в пул (удаляем из активных заменой на последний):
+            if not effect.is_infinite and len(effect.particles) == 0:
+                active[index] = active[-1]
+                active.pop()
+                self._release_(effect)
+            else: index += 1
+        return self
+
+    # Отрисовать все активные эффекты одним общим пакетом (эффекты с кадрами атласа - общим пакетом атласов):
+    def render(self, color: list = None) -> "ParticleEffectPool":
+        self.batch.begin()
+        self.atlas_batch.begin()
+        for effect in self.active: effect.render(batch=self.atlas_batch if effect._is_atlas_() else self.batch)
+        self.batch.end()
+        self.atlas_batch.end()
+        self.batch.render(color)
+        self.atlas_batch.render(color)
+        return self
+
+    # Удалить все эффекты пула:
+    def destroy(self) -> None:
+        for effect in list(self.active): self.release(effect)
+        self._free_ = {name: [] for name in self.presets}
+        self._names_.clear()
+        self.batch.destroy()
+        self.atlas_batch.destroy()
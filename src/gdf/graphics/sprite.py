@@ -7,7 +7,9 @@
 from .gl import *
 from .texture import Texture
 from .atlas import AtlasTexture
-from . import _rot2d_vertices_rectangle_
+from .buffers import VBO
+from .stats import RenderStats
+from ..math import *
 
 
 # Класс спрайта:
@@ -24,6 +26,83 @@ class Sprite2D:
             self.width  = self.texture.width
             self.height = self.texture.height
 
+        self._vbo_       = None  # Собственный буфер квадрата (только для спрайтов из атласа).
+        self._texcoords_ = None  # Текстурные координаты, записанные в собственный буфер.
+
+    # Общий буфер единичного квадрата (x, y, u, v на вершину) для обычных текстур:
+    _quad_vbo_ = None
+
+    # Состояние прохода отрисовки спрайтов (см. begin_pass):
+    _pass_          = False
+    _bound_vbo_     = None
+    _bound_texture_ = None
+
+    # Получить буфер единичного квадрата с текстурными координатами этого спрайта:
+    def _get_vbo_(self) -> VBO:
+        # Структура текстурных координат:
+        # LEFT  | BOTTOM
+        # RIGHT | BOTTOM
+        # RIGHT | TOP
+        # LEFT  | TOP
+        if type(self.texture) is Texture or self.texture is None:
+            if Sprite2D._quad_vbo_ is None:
+                Sprite2D._quad_vbo_ = VBO(Sprite2D._build_quad_([0, 1, 1, 1, 1, 0, 0, 0]))
+                RenderStats.add(bytes_uploaded=64)
+            return Sprite2D._quad_vbo_
+
+        # У спрайта из атласа свой буфер, который пересоздаётся только при смене текстурных координат:
+        texcoords = tuple(self.texture.texcoords)
+        if self._vbo_ is None or self._texcoords_ != texcoords:
+            if self._vbo_ is None: self._vbo_ = VBO(Sprite2D._build_quad_(texcoords), gl.GL_DYNAMIC_DRAW)
+            else:                  self._vbo_.update(Sprite2D._build_quad_(texcoords))
+            self._texcoords_ = texcoords
+            RenderStats.add(bytes_uploaded=64)
+        return self._vbo_
+
+    # Собрать вершины единичного квадрата:
+    @staticmethod
+    def _build_quad_(texcoords: list) -> numpy.ndarray:
+        vertices = numpy.empty((4, 4), dtype=numpy.float32)
+        vertices[:, 0:2] = [[0, 0], [1, 0], [1, 1], [0, 1]]
+        vertices[:, 2:4] = numpy.asarray(texcoords, dtype=numpy.float32).reshape(4, 2)
+        return vertices
+
+    # Включить состояние отрисовки спрайтов:
+    @staticmethod
+    def _enable_state_() -> None:
+        gl.glEnable(gl.GL_TEXTURE_2D)
+        gl.glEnableClientState(gl.GL_VERTEX_ARRAY)
+        gl.glEnableClientState(gl.GL_TEXTURE_COORD_ARRAY)
+
+    # Выключить состояние отрисовки спрайтов:
+    @staticmethod
+    def _disable_state_() -> None:
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
+        gl.glDisableClientState(gl.GL_TEXTURE_COORD_ARRAY)
+        gl.glDisableClientState(gl.GL_VERTEX_ARRAY)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, 0)
+        gl.glDisable(gl.GL_TEXTURE_2D)
+        Sprite2D._bound_vbo_ = Sprite2D._bound_texture_ = None
+
+    # Начать проход отрисовки спрайтов:
+    @staticmethod
+    def begin_pass() -> None:
+        """ Между begin_pass() и end_pass() включение текстур, массивы вершин и уже привязанные буфер и текстура
+            не переустанавливаются для каждого спрайта. Внутри прохода нельзя менять эти состояния OpenGL
+            в обход Sprite2D.
+        """
+
+        if Sprite2D._pass_: raise Exception("Function \".end_pass()\" was not called in the last iteration.")
+        Sprite2D._enable_state_()
+        Sprite2D._pass_ = True
+
+    # Закончить проход отрисовки спрайтов:
+    @staticmethod
+    def end_pass() -> None:
+        if not Sprite2D._pass_: raise Exception("Function \".begin_pass()\" was not called in the last iteration.")
+        Sprite2D._disable_state_()
+        Sprite2D._pass_ = False
+
     # Отрисовка:
     def render(self,
                x:      float,
@@ -43,42 +122,50 @@ class Sprite2D:
 
         wdth, hght = width if width is not None else self.width, height if height is not None else self.height
 
-        # Вращаем вершины спрайта:
+        # Матрица единичного квадрата: масштаб до размера спрайта, поворот вокруг центра и перенос (по столбцам).
+        # Поворот такой же как в _rot2d_vertices_rectangle_ (по часовой стрелке):
         if angle != 0.0:
-            vertices = _rot2d_vertices_rectangle_(x, y, wdth, hght, angle)
-        else:
-            vertices = [
-                x       , y       ,
-                x + wdth, y       ,
-                x + wdth, y + hght,
-                x       , y + hght,
-            ]
+            angle_rad = -radians(angle)
+            sn, cs    = sin(angle_rad), cos(angle_rad)
+            center_x  = x + wdth / 2.0
+            center_y  = y + hght / 2.0
+            matrix    = (
+                wdth * cs, wdth * sn, 0.0, 0.0,
+               -hght * sn, hght * cs, 0.0, 0.0,
+                0.0,       0.0,       1.0, 0.0,
+                center_x - (wdth * cs - hght * sn) / 2.0, center_y - (wdth * sn + hght * cs) / 2.0, 0.0, 1.0,
+            )
+        else: matrix = (wdth, 0.0, 0.0, 0.0, 0.0, hght, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, x, y, 0.0, 1.0)
 
-        # Структура текстурных координат:
-        # LEFT  | BOTTOM
-        # RIGHT | BOTTOM
-        # RIGHT | TOP
-        # LEFT  | TOP
-        if type(self.texture) is Texture or self.texture is None:
-            texcoords = [0, 1, 1, 1, 1, 0, 0, 0]
-        else: texcoords = self.texture.texcoords
+        # Включаем состояние, если мы не внутри прохода отрисовки спрайтов:
+        if not Sprite2D._pass_: Sprite2D._enable_state_()
 
-        # Рисуем спрайт:
-        gl.glEnable(gl.GL_TEXTURE_2D)
-        gl.glBindTexture(gl.GL_TEXTURE_2D, self.id)
+        # Привязываем буфер и текстуру, только если они ещё не привязаны:
+        vbo = self._get_vbo_()
+        if Sprite2D._bound_vbo_ != vbo.id:
+            gl.glBindBuffer(gl.GL_ARRAY_BUFFER, vbo.id)
+            gl.glVertexPointer(2, gl.GL_FLOAT, 16, ctypes.c_void_p(0))
+            gl.glTexCoordPointer(2, gl.GL_FLOAT, 16, ctypes.c_void_p(8))
+            Sprite2D._bound_vbo_ = vbo.id
+        texture_binds = 0
+        if Sprite2D._bound_texture_ != self.id:
+            gl.glBindTexture(gl.GL_TEXTURE_2D, self.id)
+            Sprite2D._bound_texture_ = self.id
+            texture_binds = 1
 
+        # Рисуем спрайт:
         gl.glColor(*color)
-        gl.glBegin(gl.GL_TRIANGLE_FAN)
-        for index in range(0, len(vertices), 2):
-            gl.glTexCoord(texcoords[index], texcoords[index+1])
-            gl.glVertex(vertices[index], vertices[index+1])
-        gl.glEnd()
+        gl.glPushMatrix()
+        gl.glMultMatrixf(matrix)
+        gl.glDrawArrays(gl.GL_TRIANGLE_FAN, 0, 4)
+        gl.glPopMatrix()
+        RenderStats.add(draw_calls=1, texture_binds=texture_binds, quads=1)
 
-        gl.glBindTexture(gl.GL_TEXTURE_2D, 0)
-        gl.glDisable(gl.GL_TEXTURE_2D)
+        if not Sprite2D._pass_: Sprite2D._disable_state_()
 
         return self
 
     # Удалить спрайт:
     def destroy(self) -> None:
+        if self._vbo_ is not None: self._vbo_.destroy() ; self._vbo_ = None
         self.texture.destroy()
@@ -0,0 +1,50 @@
+#
+# stats.py - Создаёт счётчики отрисовки за кадр (вызовы отрисовки, привязки текстур, квадраты, загруженные байты).
+#
+
+
+# Класс счётчиков отрисовки:
+class RenderStats:
+    """ Счётчики хранятся прямо в классе, поэтому учёт одного вызова отрисовки стоит пару сложений.
+        Окно сбрасывает счётчики в начале каждого кадра, а итоги прошлого кадра можно получить
+        через Window.get_render_stats() или RenderStats.get_last_frame().
+    """
+
+    enabled        = True  # Вести ли учёт.
+    draw_calls     = 0     # Вызовы отрисовки.
+    texture_binds  = 0     # Привязки текстур.
+    quads          = 0     # Нарисованные квадраты (спрайты).
+    bytes_uploaded = 0     # Байты вершин, переданные видеокарте.
+
+    # Итоги прошлого кадра:
+    _last_frame_ = {"draw-calls": 0, "texture-binds": 0, "quads": 0, "bytes-uploaded": 0}
+
+    # Учесть отрисовку:
+    @staticmethod
+    def add(draw_calls: int = 0, texture_binds: int = 0, quads: int = 0, bytes_uploaded: int = 0) -> None:
+        if not RenderStats.enabled: return
+        RenderStats.draw_calls     += draw_calls
+        RenderStats.texture_binds  += texture_binds
+        RenderStats.quads          += quads
+        RenderStats.bytes_uploaded += bytes_uploaded
+
+    # Получить счётчики текущего (ещё не законченного) кадра:
+    @staticmethod
+    def get() -> dict:
+        return {
+            "draw-calls":     RenderStats.draw_calls,
+            "texture-binds":  RenderStats.texture_binds,
+            "quads":          RenderStats.quads,
+            "bytes-uploaded": RenderStats.bytes_uploaded,
+        }
+
+    # Получить итоги прошлого кадра:
+    @staticmethod
+    def get_last_frame() -> dict:
+        return dict(RenderStats._last_frame_)
+
+    # Закончить кадр (итоги запоминаются, а счётчики сбрасываются). Окно вызывает это само:
+    @staticmethod
+    def new_frame() -> None:
+        RenderStats._last_frame_ = RenderStats.get()
+        RenderStats.draw_calls = RenderStats.texture_binds = RenderStats.quads = RenderStats.bytes_uploaded = 0
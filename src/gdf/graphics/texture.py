@@ -157,3 +157,79 @@ class Texture3D:
         if self.id != 0:
             gl.glDeleteTextures(1, [self.id])
             self.id = 0
+
+
+# Класс массива текстур (текстуры одинакового размера в слоях одной GL_TEXTURE_2D_ARRAY):
+class TextureArray:
+    def __init__(self, textures: list[Texture], use_mipmap: bool = False) -> None:
+        if not textures: raise ValueError("The texture array cannot be empty.")
+        self.textures = list(textures)
+        self.id       = int(gl.glGenTextures(1))
+        self.width    = self.textures[0].width
+        self.height   = self.textures[0].height
+        self.depth    = len(self.textures)
+        self.layers   = {}  # Словарь номеров слоёв (id текстуры: номер слоя).
+
+        # Все текстуры массива должны быть одного размера и с цветом (у текстур глубины нет цветных пикселей):
+        for texture in self.textures:
+            if (texture.width, texture.height) != (self.width, self.height):
+                raise ValueError(
+                    f"All textures in the texture array must be the same size ({self.width}x{self.height}). "
+                    f"Your texture size: {texture.width}x{texture.height}")
+            if texture.data is None:
+                raise ValueError(
+                    f"The texture {texture.id} has no color data (depth texture) and cannot be a texture array layer.")
+
+        self.set_linear()
+        self.set_filter([gl.GL_TEXTURE_WRAP_S, gl.GL_TEXTURE_WRAP_T], gl.GL_CLAMP_TO_EDGE)
+
+        # Создаём массив текстур и копируем каждую текстуру в свой слой. Пиксели читаются с видеокарты, а не из
+        # texture.data, поэтому в слой попадает и то, что было нарисовано в текстуру через кадровый буфер:
+        wdth, hght, dpth = self.width, self.height, self.depth
+        layers_data = [texture.get_data() for texture in self.textures]
+        gl.glBindTexture(gl.GL_TEXTURE_2D, 0)
+        gl.glBindTexture(gl.GL_TEXTURE_2D_ARRAY, self.id)
+        gl.glTexImage3D(gl.GL_TEXTURE_2D_ARRAY, 0, gl.GL_RGBA8, wdth, hght, dpth, 0, gl.GL_RGBA, gl.GL_UNSIGNED_BYTE, None)
+        for layer, (texture, data) in enumerate(zip(self.textures, layers_data)):
+            gl.glTexSubImage3D(
+                gl.GL_TEXTURE_2D_ARRAY, 0, 0, 0, layer, wdth, hght, 1, gl.GL_RGBA, gl.GL_UNSIGNED_BYTE, data)
+            self.layers[texture.id] = layer
+        if use_mipmap: gl.glGenerateMipmap(gl.GL_TEXTURE_2D_ARRAY)
+        gl.glBindTexture(gl.GL_TEXTURE_2D_ARRAY, 0)
+
+    # Использовать массив текстур:
+    def begin(self) -> "TextureArray":
+        gl.glBindTexture(gl.GL_TEXTURE_2D_ARRAY, self.id)
+        return self
+
+    # Не используем массив текстур:
+    def end(self) -> "TextureArray":
+        gl.glBindTexture(gl.GL_TEXTURE_2D_ARRAY, 0)
+        return self
+
+    # Получить номер слоя текстуры (или None, если текстуры нет в массиве):
+    def get_layer(self, texture: Texture | int) -> int | None:
+        return self.layers.get(texture if isinstance(texture, int) else texture.id)
+
+    # Установить фильтрацию массива текстур:
+    def set_filter(self, name: int, param: int) -> "TextureArray":
+        gl.glBindTexture(gl.GL_TEXTURE_2D_ARRAY, self.id)
+        if type(name) is list:
+            for names in name: gl.glTexParameterf(gl.GL_TEXTURE_2D_ARRAY, names, param)
+        else: gl.glTexParameterf(gl.GL_TEXTURE_2D_ARRAY, name, param)
+        gl.glBindTexture(gl.GL_TEXTURE_2D_ARRAY, 0)
+        return self
+
+    # Установить сглаживание массива текстур:
+    def set_linear(self) -> "TextureArray":
+        return self.set_filter([gl.GL_TEXTURE_MAG_FILTER, gl.GL_TEXTURE_MIN_FILTER], gl.GL_LINEAR)
+
+    # Установить пикселизацию массива текстур:
+    def set_pixelized(self) -> "TextureArray":
+        return self.set_filter([gl.GL_TEXTURE_MAG_FILTER, gl.GL_TEXTURE_MIN_FILTER], gl.GL_NEAREST)
+
+    # Удалить массив текстур (исходные текстуры не удаляются):
+    def destroy(self) -> None:
+        if self.id != 0:
+            gl.glDeleteTextures(1, [self.id])
+            self.id = 0
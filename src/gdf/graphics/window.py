@@ -12,6 +12,7 @@ import pygame
 from .gl import *
 from .image import Image
 from .scene import Scene
+from .stats import RenderStats
 from . import OpenGLWindowError, OpenGLContextNotSupportedError
 
 from ..audio.al import *
@@ -180,6 +181,9 @@ class Window:
             start_frame_time = time.time()
             scn = self._winvars_["current-scene"]
 
+            # Сбрасываем счётчики отрисовки (итоги прошлого кадра остаются доступны):
+            RenderStats.new_frame()
+
             self._winvars_["mouse-scroll"] = vec2(0)
             self._winvars_["mouse-rel"]    = vec2(pygame.mouse.get_rel())
             self._winvars_["mouse-down"]   = [False, False, False]
@@ -360,6 +364,11 @@ class Window:
     def get_fps(self) -> float:
         return 1.0 / self._winvars_["dtime"]
 
+    # Получить счётчики отрисовки прошлого кадра (вызовы отрисовки, привязки текстур, квадраты, загруженные байты):
+    @staticmethod
+    def get_render_stats() -> dict:
+        return RenderStats.get_last_frame()
+
     # Установить видимость окна:
     def set_visible(self, visible: bool) -> None:
         self._winvars_["visible"] = visible
@@ -120,6 +120,39 @@ class Physics2D:
             distance = f"{round(self.distance, 4)}"
             return f"ContactPoint(point_a={vtr(self.point_a)}, point_b={vtr(self.point_b)}, distance={distance})"
 
+    # Сетка столкновений (снимок геометрии пространства для массовых проверок точек, например частиц):
+    class CollisionGrid:
+        """ Каждая клетка хранит, занята ли она геометрией, и нормаль ближайшей к центру клетки поверхности
+            (направление наружу из формы). Проверка тысяч точек это несколько операций над массивами NumPy,
+            без запросов к pymunk. Создаётся через Physics2D.Space.get_collision_grid().
+        """
+
+        def __init__(self, origin: vec2, cell_size: float, solid: numpy.ndarray, normals: numpy.ndarray) -> None:
+            self.origin    = vec2(origin)      # Левый нижний угол сетки.
+            self.cell_size = float(cell_size)  # Размер клетки.
+            self.solid     = solid             # Занятость клеток (высота, ширина).
+            self.normals   = normals           # Нормали клеток (высота, ширина, 2).
+            self.height, self.width = solid.shape
+
+        # Проверить точки (массив (N, 2)). Возвращает маску точек внутри геометрии и нормали в этих точках:
+        def query(self, points: numpy.ndarray) -> tuple[numpy.ndarray, numpy.ndarray]:
+            cells  = numpy.floor((points - (self.origin.x, self.origin.y)) / self.cell_size).astype(numpy.int64)
+            ix, iy = cells[:, 0], cells[:, 1]
+            inside = (ix >= 0) & (ix < self.width) & (iy >= 0) & (iy < self.height)
+            hits   = numpy.zeros(len(points), dtype=numpy.bool_)
+            hits[inside] = self.solid[iy[inside], ix[inside]]
+            normals = numpy.zeros((len(points), 2))
+            normals[hits] = self.normals[iy[hits], ix[hits]]
+            return hits, normals
+
+        # Проверить одну точку. Возвращает (внутри ли геометрии, нормаль x, нормаль y):
+        def query_point(self, x: float, y: float) -> tuple[bool, float, float]:
+            ix = int(floor((x - self.origin.x) / self.cell_size))
+            iy = int(floor((y - self.origin.y) / self.cell_size))
+            if ix < 0 or iy < 0 or ix >= self.width or iy >= self.height or not self.solid[iy, ix]:
+                return False, 0.0, 0.0
+            return True, float(self.normals[iy, ix, 0]), float(self.normals[iy, ix, 1])
+
     # Физические объекты:
     class Objects:
         # Общий родительский класс физических объектов:
@@ -827,3 +860,57 @@ class Physics2D:
         def find_objects(self, point: vec2, max_dst: float,
                          shape_filter: pymunk.ShapeFilter = pymunk.ShapeFilter()) -> list:
             return _p2d_space_find_objects_(Physics2D, self.space, self.objects, point, max_dst, shape_filter)
+
+        # Сделать сетку столкновений из геометрии пространства (для массовых проверок, например частиц):
+        def get_collision_grid(self,
+                               cell_size:       float,
+                               bounds:          list = None,
+                               include_dynamic: bool = False) -> "Physics2D.CollisionGrid":
+            """ cell_size       - Размер клетки. Чем меньше, тем точнее, но дольше создание и больше памяти.
+                bounds          - Область сетки [vec2(левый нижний угол), vec2(правый верхний угол)].
+                                  По умолчанию охватывает все формы.
+                include_dynamic - Учитывать динамические тела. По умолчанию только статические и кинематические,
+                                  так как сетка это снимок и не следит за движением тел.
+                Сетку нужно пересоздать, если геометрия изменилась.
+            """
+
+            if cell_size <= 0: raise ValueError(f"The cell size must be greater than zero. Your cell size: {cell_size}")
+
+            shapes = [shape for shape in self.space.shapes
+                      if include_dynamic or shape.body.body_type != pymunk.Body.DYNAMIC]
+            bbs = [shape.cache_bb() for shape in shapes]
+
+            # Область сетки:
+            if bounds is not None:  # Углы могут быть указаны в любом порядке:
+                left,  right = float(min(bounds[0].x, bounds[1].x)), float(max(bounds[0].x, bounds[1].x))
+                bottom, top  = float(min(bounds[0].y, bounds[1].y)), float(max(bounds[0].y, bounds[1].y))
+            elif bbs:
+                left   = float(numpy.min([bb.left   for bb in bbs])) - cell_size
+                bottom = float(numpy.min([bb.bottom for bb in bbs])) - cell_size
+                right  = float(numpy.max([bb.right  for bb in bbs])) + cell_size
+                top    = float(numpy.max([bb.top    for bb in bbs])) + cell_size
+            else: left = bottom = right = top = 0.0
+
+            width   = int(numpy.ceil((right - left) / cell_size)) or 1
+            height  = int(numpy.ceil((top - bottom) / cell_size)) or 1
+            solid   = numpy.zeros((height, width), dtype=numpy.bool_)
+            normals = numpy.zeros((height, width, 2))
+            nearest = numpy.full((height, width), float("inf"))
+            half    = cell_size / 2
+
+            # Проверяем центры клеток внутри рамки каждой формы (клетка занята, если форма ближе половины клетки):
+            for shape, bb in zip(shapes, bbs):
+                ix0 = int(numpy.clip(numpy.floor((bb.left   - half - left)   / cell_size), 0, width  - 1))
+                ix1 = int(numpy.clip(numpy.floor((bb.right  + half - left)   / cell_size), 0, width  - 1))
+                iy0 = int(numpy.clip(numpy.floor((bb.bottom - half - bottom) / cell_size), 0, height - 1))
+                iy1 = int(numpy.clip(numpy.floor((bb.top    + half - bottom) / cell_size), 0, height - 1))
+                for iy in range(iy0, iy1 + 1):
+                    center_y = bottom + (iy + 0.5) * cell_size
+                    for ix in range(ix0, ix1 + 1):
+                        info = shape.point_query((left + (ix + 0.5) * cell_size, center_y))
+                        if info.distance <= half and info.distance < nearest[iy, ix]:
+                            solid[iy, ix]   = True
+                            nearest[iy, ix] = info.distance
+                            normals[iy, ix] = info.gradient.x, info.gradient.y
+
+            return Physics2D.CollisionGrid(vec2(left, bottom), cell_size, solid, normals)